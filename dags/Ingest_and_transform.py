@@ -5,7 +5,10 @@ from airflow.providers.common.sql.operators.sql import SQLExecuteQueryOperator
 from airflow.providers.slack.hooks.slack_webhook import SlackWebhookHook
 from airflow.providers.smtp.operators.smtp import EmailOperator
 from airflow.sdk import TaskGroup
+from airflow.sdk import Param
 from airflow.providers.amazon.aws.hooks.s3 import S3Hook
+from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook
+from airflow.exceptions import AirflowSkipException, AirflowFailException
 from pendulum import datetime
 from datetime import timedelta
 from airflow.sdk.bases.hook import BaseHook
@@ -15,11 +18,39 @@ from ingestion.call_center_ingest import ingest_call_center_logs
 from ingestion.social_media_ingest import ingest_social_media
 from ingestion.web_complaints_ingest import ingest_website_complaints
 from ingestion.agents_ingest import ingest_agents
+from ingestion.micro_batch import run_micro_batch_ingestion
+from ingestion.micro_batch_sensor import SourceChangeSensor
+from ingestion.raw_load import (
+    build_targeted_copy_statements,
+    build_targeted_delete_statements,
+    build_request_day_query,
+)
+from ingestion.backfill import run_backfill, DEFAULT_MAX_PARALLEL
+from ingestion.fingerprint import load_json_state, save_json_state
+from ingestion.s3_ingestion import S3_BUCKET
+from ingestion.web_complaints_ingest import create_postgres_engine
+from monitoring.performance_history import (
+    collect_performance,
+    PerformanceHistoryStore,
+    format_regressions,
+    PERF_HISTORY_TABLE,
+)
 
 # Airflow connection IDs
 SOURCE_READ_CONN = "aws_default"
 RAW_WRITE_CONN = "aws_personal"
 
+# Micro-batch cadence for near-real-time complaint ingestion
+MICRO_BATCH_INTERVAL_MINUTES = int(os.environ.get("MICRO_BATCH_INTERVAL_MINUTES", "5"))
+
+# Pools shared by the daily, micro-batch and backfill DAGs (created by airflow-init)
+# - dbt: one slot, so gold rebuilds never overlap and runs don't clobber target/run_results.json
+# - raw ingest: one slot per daily source task; micro-batch/backfill ingestion takes every slot,
+#   so it never races a daily task on the same _fingerprints/<source>/ index
+DBT_POOL = "coretelecoms_dbt"
+RAW_INGEST_POOL = "coretelecoms_raw_ingest"
+RAW_INGEST_POOL_SLOTS = 5
+
 
 def get_snowflake_dbt_env():
 
@@ -100,21 +131,21 @@ def get_s3_read_session():
 # Ingestion task callables
 
 def run_customers_ingestion():
-    ingest_customers(
+    return ingest_customers(
         get_s3_read_client(),
         get_s3_write_client()
     )
 
 
 def run_call_center_ingestion():
-    ingest_call_center_logs(
+    return ingest_call_center_logs(
         get_s3_read_client(),
         get_s3_write_client()
     )
 
 
 def run_social_media_ingestion():
-    ingest_social_media(
+    return ingest_social_media(
         get_s3_read_client(),
         get_s3_write_client()
     )
@@ -125,18 +156,152 @@ def run_web_complaints_ingestion():
     Intentionally uses boto3 Session.
     This is isolated to avoid breaking other ingestion contracts.
     """
-    ingest_website_complaints(
+    return ingest_website_complaints(
         get_s3_read_session(),
         get_s3_write_client()
     )
 
 
 def run_agents_ingestion():
-    ingest_agents(
+    return ingest_agents(
         get_s3_write_client()
     )
 
 
+# Daily ingestion task id per RAW source; their return values are the RAW keys written
+SOURCE_INGESTION_TASKS = {
+    "customers": "source_ingestion.customers",
+    "call_center_logs": "source_ingestion.call_center_logs",
+    "social_media": "source_ingestion.social_media",
+    "website_complaints": "source_ingestion.web_complaints",
+    "agents": "source_ingestion.agents",
+}
+
+
+def run_record_performance(dag_run, ti):
+    """
+    Store dbt model and COPY metrics for this run and alert (via slack_fail_alert)
+    when any of them regresses past its baseline.
+    """
+    written = {
+        source: ti.xcom_pull(task_ids=task_id) or []
+        for source, task_id in SOURCE_INGESTION_TASKS.items()
+    }
+
+    hook = SnowflakeHook(snowflake_conn_id="snowflake_conn")
+    conn = hook.get_conn()
+    try:
+        rows = collect_performance(dag_run.run_id, dag_run.start_date, snowflake_conn=conn, written=written)
+    finally:
+        conn.close()
+
+    regressions = PerformanceHistoryStore(hook.get_sqlalchemy_engine(), table=PERF_HISTORY_TABLE).record(rows)
+
+    if regressions:
+        raise AirflowFailException(format_regressions(regressions))
+
+
+# Micro-batch task callables
+
+def run_micro_batch_ingest(ti):
+    changes = ti.xcom_pull(task_ids="detect_source_changes")
+    return run_micro_batch_ingestion(
+        changes,
+        get_s3_read_client(),
+        get_s3_write_client(),
+        session=get_s3_read_session(),
+    )
+
+
+def run_micro_batch_load(ti):
+    """COPY only the RAW files written by this micro-batch."""
+    batch = ti.xcom_pull(task_ids="ingest_changes")
+    statements = build_targeted_copy_statements(batch["written"])
+
+    if not statements:
+        raise AirflowSkipException("No new RAW files were written in this micro-batch.")
+
+    SnowflakeHook(snowflake_conn_id="snowflake_conn").run(statements, autocommit=True)
+
+
+def dbt_run_affected_command(batch_task_id):
+    """dbt run for only the models touched by a micro-batch or backfill task's output."""
+    batch = f"ti.xcom_pull(task_ids='{batch_task_id}')"
+    return (
+        "cd /opt/airflow/dbt/telecoms_project && "
+        f"dbt run --select {{{{ {batch}['dbt_select'] }}}} "
+        f"--vars '{{batch_loaded_after: \"{{{{ {batch}['batch_loaded_after'] }}}}\"}}'"
+    )
+
+
+def backfill_dbt_command():
+    """
+    dbt runs for a backfill: the curated models whose RAW rows were deleted are fully
+    refreshed (incremental models cannot drop them), then the gold partitions of both
+    the reloaded rows and the deleted rows' request days are rebuilt.
+    """
+    batch = "ti.xcom_pull(task_ids='backfill_ingest')"
+    load = "ti.xcom_pull(task_ids='backfill_load_to_snowflake')"
+    return (
+        "cd /opt/airflow/dbt/telecoms_project && "
+        f"dbt run --select {{{{ {batch}['dbt_curated_select'] }}}} --full-refresh && "
+        f"dbt run --select {{{{ {batch}['dbt_select'] }}}} "
+        f"--vars '{{batch_loaded_after: \"{{{{ {batch}['batch_loaded_after'] }}}}\", "
+        f"refresh_request_days: {{{{ {load}['refresh_request_days'] | tojson }}}}}}'"
+    )
+
+
+# Backfill task callables
+
+def run_backfill_ingest(params):
+    engine, schema = create_postgres_engine(get_s3_read_session())
+    try:
+        return run_backfill(
+            params["start_date"],
+            params["end_date"],
+            get_s3_read_client(),
+            get_s3_write_client(),
+            engine=engine,
+            schema=schema,
+            max_parallel=params["max_parallel"],
+        )
+    finally:
+        engine.dispose()
+
+
+def run_backfill_load(ti, run_id):
+    """
+    Delete RAW rows of the rebuilt source objects and force-COPY their new files in one
+    transaction, so a failed COPY leaves the old rows in place.
+
+    Returns the request days of the deleted rows, so dbt also rebuilds gold partitions
+    that no reloaded row lands on any more. They are saved per run before the delete,
+    so a retry after a committed delete still returns them.
+    """
+    batch = ti.xcom_pull(task_ids="backfill_ingest")
+    statements = (
+        build_targeted_delete_statements(batch["lineage"])
+        + build_targeted_copy_statements(batch["written"], force=True)
+    )
+
+    if not statements:
+        raise AirflowSkipException("Backfill wrote no RAW files.")
+
+    hook = SnowflakeHook(snowflake_conn_id="snowflake_conn")
+    s3 = get_s3_write_client()
+    state_name = f"backfill/{run_id}/refresh_request_days.json"
+
+    refresh_request_days = set(load_json_state(s3, S3_BUCKET, state_name).get("refresh_request_days", []))
+    request_day_query = build_request_day_query(batch["lineage"])
+    if request_day_query:
+        refresh_request_days.update(r[0] for r in hook.get_records(request_day_query))
+    save_json_state(s3, S3_BUCKET, state_name, {"refresh_request_days": sorted(refresh_request_days)})
+
+    hook.run(["BEGIN;"] + statements + ["COMMIT;"], autocommit=False)
+
+    return {"refresh_request_days": sorted(refresh_request_days)}
+
+
 default_args = {
     "owner": "coretelecoms",
     "depends_on_past": False,
@@ -152,6 +317,8 @@ with DAG(
     start_date=datetime(2025, 12, 1),
     schedule="@daily",
     catchup=False,
+    # A manual run overlapping the scheduled one would race the same source's _fingerprints/ index
+    max_active_runs=1,
     tags=["coretelecoms", "ELT",  "s3", "snowflake", "dbt"],
 ) as dag:
 
@@ -166,26 +333,31 @@ with DAG(
         customers_ingestion = PythonOperator(
             task_id="customers",
             python_callable=run_customers_ingestion,
+            pool=RAW_INGEST_POOL,
         )
 
         call_center_logs_ingestion = PythonOperator(
             task_id="call_center_logs",
             python_callable=run_call_center_ingestion,
+            pool=RAW_INGEST_POOL,
         )
 
         social_media_ingestion = PythonOperator(
             task_id="social_media",
             python_callable=run_social_media_ingestion,
+            pool=RAW_INGEST_POOL,
         )
 
         web_complaints_ingestion = PythonOperator(
             task_id="web_complaints",
             python_callable=run_web_complaints_ingestion,
+            pool=RAW_INGEST_POOL,
         )
 
         agents_ingestion = PythonOperator(
             task_id="agents",
             python_callable=run_agents_ingestion,
+            pool=RAW_INGEST_POOL,
         )
 
 #  load Raw Data using the Stored Procedure you created
@@ -199,10 +371,12 @@ with DAG(
     # dbt Transformation Layer
     run_dbt_curated = BashOperator(
         task_id="dbt_run_curated",
+        pool=DBT_POOL,
         bash_command=(
             "cd /opt/airflow/dbt/telecoms_project && "
             "dbt debug && "
-            "dbt run --select curated"
+            "dbt run --select curated && "
+            "cp target/run_results.json target/run_results_curated.json"
         ),
         env=get_snowflake_dbt_env(),
         append_env=True, 
@@ -210,6 +384,7 @@ with DAG(
 
     test_dbt_curated = BashOperator(
         task_id="test_dbt_curated",
+        pool=DBT_POOL,
         bash_command="cd /opt/airflow/dbt/telecoms_project && dbt test --select curated",
         env=get_snowflake_dbt_env(),
         append_env=True,
@@ -217,7 +392,12 @@ with DAG(
 
     run_dbt_gold = BashOperator(
         task_id="dbt_run_gold",
-        bash_command="cd /opt/airflow/dbt/telecoms_project && dbt run --select gold",
+        pool=DBT_POOL,
+        bash_command=(
+            "cd /opt/airflow/dbt/telecoms_project && "
+            "dbt run --select gold --full-refresh && "
+            "cp target/run_results.json target/run_results_gold.json"
+        ),
         env=get_snowflake_dbt_env(),
         append_env=True,
     )
@@ -225,6 +405,7 @@ with DAG(
 
     test_dbt_gold = BashOperator(
         task_id="test_dbt_gold",
+        pool=DBT_POOL,
         bash_command="cd /opt/airflow/dbt/telecoms_project && dbt test --select gold",
         env=get_snowflake_dbt_env(),
         append_env=True,
@@ -246,5 +427,97 @@ with DAG(
         on_success_callback=slack_success_alert
    )
 
+
+    record_performance = PythonOperator(
+        task_id="record_performance_history",
+        python_callable=run_record_performance,
+        retries=0,
+    )
+
    
     ingest_raw_data >> load_raw_data >> run_dbt_curated >> test_dbt_curated >> run_dbt_gold >> test_dbt_gold >> send_success_email
+    test_dbt_gold >> record_performance
+
+
+# Micro-batch DAG: detect new complaints, ingest only those, refresh affected gold partitions
+
+with DAG(
+    dag_id="coretelecoms_micro_batch_pipeline",
+    default_args=default_args,
+    start_date=datetime(2025, 12, 1),
+    schedule=timedelta(minutes=MICRO_BATCH_INTERVAL_MINUTES),
+    catchup=False,
+    max_active_runs=1,
+    tags=["coretelecoms", "ELT", "micro-batch", "s3", "snowflake", "dbt"],
+) as micro_batch_dag:
+
+    detect_source_changes = SourceChangeSensor(
+        task_id="detect_source_changes",
+        source_conn_id=SOURCE_READ_CONN,
+        raw_conn_id=RAW_WRITE_CONN,
+        poke_interval=60,
+        timeout=MICRO_BATCH_INTERVAL_MINUTES * 60,
+        retries=0,
+    )
+
+    ingest_changes = PythonOperator(
+        task_id="ingest_changes",
+        python_callable=run_micro_batch_ingest,
+        pool=RAW_INGEST_POOL,
+        pool_slots=RAW_INGEST_POOL_SLOTS,
+    )
+
+    load_changes = PythonOperator(
+        task_id="load_changes_to_snowflake",
+        python_callable=run_micro_batch_load,
+    )
+
+    run_dbt_affected = BashOperator(
+        task_id="dbt_run_affected",
+        pool=DBT_POOL,
+        bash_command=dbt_run_affected_command("ingest_changes"),
+        env=get_snowflake_dbt_env(),
+        append_env=True,
+    )
+
+    detect_source_changes >> ingest_changes >> load_changes >> run_dbt_affected
+
+
+# Backfill DAG: rebuild RAW partitions and affected gold days for a historical date range
+
+with DAG(
+    dag_id="coretelecoms_backfill_pipeline",
+    default_args=default_args,
+    start_date=datetime(2025, 12, 1),
+    schedule=None,
+    catchup=False,
+    max_active_runs=1,
+    params={
+        "start_date": Param(type="string", format="date", description="First logical date (inclusive)"),
+        "end_date": Param(type="string", format="date", description="Last logical date (inclusive)"),
+        "max_parallel": Param(DEFAULT_MAX_PARALLEL, type="integer", minimum=1, description="Dates processed concurrently"),
+    },
+    tags=["coretelecoms", "ELT", "backfill", "s3", "snowflake", "dbt"],
+) as backfill_dag:
+
+    backfill_ingest = PythonOperator(
+        task_id="backfill_ingest",
+        python_callable=run_backfill_ingest,
+        pool=RAW_INGEST_POOL,
+        pool_slots=RAW_INGEST_POOL_SLOTS,
+    )
+
+    backfill_load = PythonOperator(
+        task_id="backfill_load_to_snowflake",
+        python_callable=run_backfill_load,
+    )
+
+    backfill_dbt = BashOperator(
+        task_id="dbt_run_affected",
+        pool=DBT_POOL,
+        bash_command=backfill_dbt_command(),
+        env=get_snowflake_dbt_env(),
+        append_env=True,
+    )
+
+    backfill_ingest >> backfill_load >> backfill_dbt
@@ -0,0 +1,20 @@
+{% macro affected_request_days() %}
+    -- Request days touched by rows loaded after var('batch_loaded_after'),
+    -- plus any days listed in var('refresh_request_days')
+    SELECT DATE_TRUNC('day', call_start_time) AS request_day
+    FROM {{ ref('call_center_logs') }}
+    WHERE load_timestamp >= '{{ var("batch_loaded_after") }}'
+    UNION
+    SELECT DATE_TRUNC('day', request_date) AS request_day
+    FROM {{ ref('social_media') }}
+    WHERE load_timestamp >= '{{ var("batch_loaded_after") }}'
+    UNION
+    SELECT DATE_TRUNC('day', request_date) AS request_day
+    FROM {{ ref('website_complaint_forms') }}
+    WHERE load_timestamp >= '{{ var("batch_loaded_after") }}'
+    {#- Days whose RAW rows a backfill deleted, even if no reloaded row lands on them #}
+    {%- for day in var("refresh_request_days", []) %}
+    UNION
+    SELECT '{{ day }}'::timestamp AS request_day
+    {%- endfor %}
+{% endmacro %}
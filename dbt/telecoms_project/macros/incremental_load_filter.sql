@@ -0,0 +1,13 @@
+{% macro incremental_load_filter() %}
+    {%- if is_incremental() %}
+    -- Only RAW rows loaded since the newest curated row, minus a lookback so files
+    -- written earlier but COPYed later (e.g. daily vs micro-batch) are not missed
+    WHERE load_timestamp >= (
+        SELECT COALESCE(
+            DATEADD(hour, -{{ var('curated_lookback_hours', 24) }}, MAX(load_timestamp)),
+            '1970-01-01'::timestamp
+        )
+        FROM {{ this }}
+    )
+    {%- endif %}
+{% endmacro %}
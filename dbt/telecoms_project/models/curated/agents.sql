@@ -1,4 +1,8 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='raw_row_hash',
+    incremental_strategy='delete+insert'
+) }}
 
 WITH source AS (
     SELECT
@@ -7,8 +11,10 @@ WITH source AS (
         data:"state"::string AS state,
         data:"ingestion_timestamp"::timestamp AS ingestion_timestamp,
         data:"load_timestamp"::timestamp AS load_timestamp,
+        MD5(data::string) AS raw_row_hash,
         INITCAP(data:"NamE"::string) AS name
     FROM {{ source('core_telecoms_raw', 'agents_raw') }}
 )
 
 SELECT * FROM source
+    {{ incremental_load_filter() }}
@@ -1,4 +1,8 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='raw_row_hash',
+    incremental_strategy='delete+insert'
+) }}
 
 WITH source AS (
     SELECT
@@ -11,8 +15,10 @@ WITH source AS (
         data:"address"::string AS address,
         data:"source_file"::string AS source_file,
         data:"ingestion_timestamp"::number AS ingestion_timestamp,
-        data:"load_timestamp"::timestamp AS load_timestamp
+        data:"load_timestamp"::timestamp AS load_timestamp,
+        MD5(data::string) AS raw_row_hash
     FROM {{ source('core_telecoms_raw', 'customers_raw') }}
 )
 
 SELECT * FROM source
+    {{ incremental_load_filter() }}
@@ -19,7 +19,11 @@
 
 -- SELECT * FROM source
 
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='raw_row_hash',
+    incremental_strategy='delete+insert'
+) }}
 
 WITH source AS (
     SELECT
@@ -31,6 +35,7 @@ WITH source AS (
 
         -- SAFE TIMESTAMP CASTS
         data:"source_file"::string AS source_file,
+        MD5(data::string) AS raw_row_hash,
         INITCAP(data:"COMPLAINT_catego ry"::string) AS complaint_category,
         TRY_TO_TIMESTAMP(NULLIF(data:"request_date"::string, ''))
             AS request_date,
@@ -49,3 +54,4 @@ WITH source AS (
 )
 
 SELECT * FROM source
+    {{ incremental_load_filter() }}
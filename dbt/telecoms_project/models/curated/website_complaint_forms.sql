@@ -1,4 +1,8 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='raw_row_hash',
+    incremental_strategy='delete+insert'
+) }}
 
 WITH source AS (
     SELECT
@@ -10,6 +14,7 @@ WITH source AS (
 
         -- SAFE DATE & TIMESTAMP CASTS
         data:"source_file"::string AS source_file,
+        MD5(data::string) AS raw_row_hash,
         INITCAP(data:"COMPLAINT_catego ry"::string) AS complaint_category,
         TRY_TO_TIMESTAMP(NULLIF(data:"request_date"::string, ''))
             AS request_date,
@@ -30,3 +35,4 @@ WITH source AS (
 )
 
 SELECT * FROM source
+    {{ incremental_load_filter() }}
@@ -1,4 +1,11 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='request_day',
+    incremental_strategy='delete+insert'
+) }}
+
+-- Full rebuild on the daily run (--full-refresh); micro-batches pass
+-- batch_loaded_after and only replace the affected request_day partitions
 
 SELECT
     request_day,
@@ -8,6 +15,9 @@ SELECT
     AVG(resolution_hours) AS avg_resolution_hours,
     COUNT_IF(NOT resolved_flag) AS total_unresolved
 FROM {{ ref('fct_all_complaints') }}
+{% if is_incremental() and var('batch_loaded_after', none) %}
+    WHERE request_day IN ({{ affected_request_days() }})
+{% endif %}
 GROUP BY
     request_day,
     channel
@@ -1,4 +1,11 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='request_day',
+    incremental_strategy='delete+insert'
+) }}
+
+-- Full rebuild on the daily run (--full-refresh); micro-batches pass
+-- batch_loaded_after and only replace the affected request_day partitions
 
 -- GOLD FACT TABLE: Unified complaints + joins
 
@@ -77,3 +84,6 @@ joined AS (
 )
 
 SELECT * FROM joined
+{% if is_incremental() and var('batch_loaded_after', none) %}
+    WHERE request_day IN ({{ affected_request_days() }})
+{% endif %}
@@ -0,0 +1,26 @@
+USE DATABASE CORE_TELECOMS;
+
+CREATE SCHEMA IF NOT EXISTS MONITORING;
+USE SCHEMA MONITORING;
+
+-- One row per dbt model / RAW COPY target per pipeline run, written by the
+-- record_performance_history task and used as the regression baseline.
+CREATE TABLE IF NOT EXISTS PERFORMANCE_HISTORY (
+    run_id VARCHAR,
+    recorded_at TIMESTAMP_NTZ,
+    kind VARCHAR,              -- 'dbt_model' or 'copy'
+    name VARCHAR,              -- model name or RAW table
+    status VARCHAR,
+    execution_seconds FLOAT,
+    rows_affected BIGINT,
+    bytes_scanned BIGINT,
+    cloud_services_credits FLOAT,
+    files_loaded INTEGER,
+    is_regression BOOLEAN
+);
+
+GRANT USAGE ON SCHEMA CORE_TELECOMS.MONITORING TO ROLE ETL_ROLE;
+GRANT SELECT, INSERT ON TABLE CORE_TELECOMS.MONITORING.PERFORMANCE_HISTORY TO ROLE ETL_ROLE;
+
+-- Needed for compute credit attribution (best-effort if not granted)
+GRANT IMPORTED PRIVILEGES ON DATABASE SNOWFLAKE TO ROLE ETL_ROLE;
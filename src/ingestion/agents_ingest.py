@@ -1,19 +1,68 @@
-import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 from datetime import datetime, timezone
 import os
 import logging
 
-from .s3_ingestion import write_dataframe_to_s3
+from .s3_ingestion import write_dataframe_to_s3, S3_BUCKET
+from .fingerprint import load_json_state, save_json_state
+from .gsheets_client import GspreadSheetsClient
 
+AGENTS_SHEET_TITLE = "coretelecoms_agents"
+AGENTS_SHEET_RANGE = "A:Z"
 
-def ingest_agents(s3_client_write=None):
+# Optional override; when set the Drive search by title is never needed
+AGENTS_SHEET_KEY = os.environ.get("AGENTS_SHEET_KEY")
+
+# Cached spreadsheet key + last ingested modifiedTime
+AGENTS_SHEET_STATE_NAME = "agents/sheet_state.json"
+
+# Column types applied when building the frame from raw sheet values
+AGENTS_DTYPES = {
+    "iD": "Int64",
+    "NamE": "string",
+    "experience": "category",
+    "state": "category",
+}
+
+
+def values_to_frame(values, dtypes=AGENTS_DTYPES):
+    """
+    Build a typed DataFrame from a Sheets values range (first row is the header).
+
+    The Sheets API drops trailing empty cells, so short rows are padded.
+    """
+    if len(values) < 2:
+        return pd.DataFrame()
+
+    header = [str(h) for h in values[0]]
+    width = len(header)
+    rows = [list(r[:width]) + [None] * (width - len(r)) for r in values[1:]]
+
+    df = pd.DataFrame(rows, columns=header).replace("", None)
+
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if dtype == "Int64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        else:
+            df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def ingest_agents(s3_client_write=None, sheets_client=None):
     """
     Ingests agents data from Google Sheets and writes to RAW S3.
 
     Parameters:
     - s3_client_write: boto3 client for writing raw data (required)
+    - sheets_client: GspreadSheetsClient or LocalSheetsClient (optional, defaults to service account auth)
+
+    On most days this costs one Drive metadata call: the spreadsheet key is cached,
+    and the sheet is only read when its modifiedTime differs from the last ingested one.
+
+    Returns the list of RAW S3 keys written.
     """
     if s3_client_write is None:
         raise ValueError("s3_client_write must be provided for writing to RAW S3")
@@ -21,56 +70,60 @@ def ingest_agents(s3_client_write=None):
     logging.info("Starting Agents ingestion from Google Sheets...")
 
     try:
-        #  Authenticate using JSON key
-        creds_path = "/opt/airflow/credentials/gsheet_ingestor.json"
+        client = sheets_client or GspreadSheetsClient.from_service_account_file()
 
-        if not os.path.exists(creds_path):
-            raise FileNotFoundError(f"Google Sheets credentials file not found: {creds_path}")
+        state = load_json_state(s3_client_write, S3_BUCKET, AGENTS_SHEET_STATE_NAME)
+        sheet_key = AGENTS_SHEET_KEY or state.get("spreadsheet_key")
 
-        logging.info("Authenticating Google Sheets client...")
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets.readonly",
-            "https://www.googleapis.com/auth/drive.readonly",
-        ]
+        if not sheet_key:
+            logging.info(f"No cached key. Looking up Google Sheet by name: {AGENTS_SHEET_TITLE}...")
+            sheet_key = client.find_key(AGENTS_SHEET_TITLE)
 
-        creds = Credentials.from_service_account_file(creds_path, scopes=scopes)
-        client = gspread.authorize(creds)
+        try:
+            modified_time = client.get_modified_time(sheet_key)
+        except FileNotFoundError:
+            # A re-created sheet gets a new key; a pinned key is a configuration error
+            if AGENTS_SHEET_KEY:
+                raise
+            logging.warning(f"Cached spreadsheet key {sheet_key} not found. Looking up {AGENTS_SHEET_TITLE} again...")
+            sheet_key = client.find_key(AGENTS_SHEET_TITLE)
+            modified_time = client.get_modified_time(sheet_key)
 
-        
-        logging.info("Opening Google Sheet: coretelecoms_agents...")
-        sheet = client.open("coretelecoms_agents").sheet1
+        if state.get("spreadsheet_key") == sheet_key and state.get("modified_time") == modified_time:
+            logging.info(f"Agents sheet unchanged since {modified_time}. Nothing to ingest.")
+            return []
 
-        
-        logging.info("Reading rows from Google Sheets...")
-        rows = sheet.get_all_records()
-        df = pd.DataFrame(rows)
+        logging.info(f"Reading range {AGENTS_SHEET_RANGE} from Google Sheets (modified {modified_time})...")
+        df = values_to_frame(client.get_values(sheet_key, AGENTS_SHEET_RANGE))
 
         if df.empty:
             logging.warning("Agents sheet is empty. Nothing to ingest.")
-            return
+            return []
 
-        
         df["ingestion_timestamp"] = datetime.now(timezone.utc)
 
         print(df.head())
 
         logging.info(f"Fetched {len(df)} agent records.")
 
-
         logging.info("Writing Agents data to RAW S3...")
-        write_dataframe_to_s3(
+        s3_path = write_dataframe_to_s3(
             df=df,
             source="agents",
             filename="agents.parquet",
             s3_client_write=s3_client_write
         )
 
+        save_json_state(
+            s3_client_write,
+            S3_BUCKET,
+            AGENTS_SHEET_STATE_NAME,
+            {"spreadsheet_key": sheet_key, "modified_time": modified_time},
+        )
+
         logging.info("Agents ingestion completed successfully.")
+        return [s3_path] if s3_path else []
 
     except Exception as e:
         logging.error(f"Error during Agents ingestion: {e}", exc_info=True)
-        raise 
-
-
-
-
+        raise
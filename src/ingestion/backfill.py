@@ -0,0 +1,211 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+import logging
+import re
+
+from .micro_batch import S3_SOURCES
+from .web_complaints_ingest import ingest_website_complaints, discover_web_form_tables
+from .raw_load import build_dbt_selector, build_curated_selector
+from .s3_ingestion import S3_BUCKET
+from .fingerprint import apply_index_updates
+
+# Matches 2025-11-20 / 2025_11_20 in file and table names
+DATE_PATTERN = re.compile(r"(\d{4})[-_](\d{2})[-_](\d{2})")
+
+DEFAULT_MAX_PARALLEL = 4
+
+
+def logical_date_from_name(name):
+    """Return the date embedded in a file or table name, or None."""
+    match = DATE_PATTERN.search(name)
+    if not match:
+        return None
+
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def list_source_objects(s3_client, bucket, prefix):
+    """List (key, LastModified) for every object under a source prefix."""
+    objects = []
+
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith("/"):
+                objects.append((obj["Key"], obj["LastModified"]))
+
+    return objects
+
+
+def plan_backfill(start, end, s3_client_read, engine=None, schema=None, sources=None):
+    """
+    Map source objects to their logical date within [start, end].
+
+    The date in the object/table name wins; S3 objects without one (e.g. the
+    customers dataset) fall back to their LastModified date. Web form tables
+    without a date in their name are skipped.
+
+    Returns {"YYYY-MM-DD": {source: [keys or tables]}}.
+    """
+    plan = {}
+
+    for source, (bucket, prefix, _) in S3_SOURCES.items():
+        if sources and source not in sources:
+            continue
+
+        for key, modified in list_source_objects(s3_client_read, bucket, prefix):
+            day = logical_date_from_name(key.split("/")[-1]) or modified.date()
+            if start <= day <= end:
+                plan.setdefault(day.isoformat(), {}).setdefault(source, []).append(key)
+
+    if engine is not None and (not sources or "website_complaints" in sources):
+        for table in discover_web_form_tables(engine, schema):
+            day = logical_date_from_name(table)
+            if day is None:
+                logging.warning(f"No logical date in table name {table}. Skipping in backfill.")
+                continue
+            if start <= day <= end:
+                plan.setdefault(day.isoformat(), {}).setdefault("website_complaints", []).append(table)
+
+    return plan
+
+
+def lineage_value(source, key):
+    """The source_file / source_table value the ingestor stamps for a source object."""
+    if source in ("customers", "website_complaints"):
+        return key
+    return key.split("/")[-1]
+
+
+def backfill_date(day, day_plan, s3_client_read, s3_client_write, engine=None, schema=None):
+    """
+    Re-ingest one logical date into its raw/<source>/<day>/ partitions, overwriting them.
+
+    Returns (written, failed, index_updates): {source: [raw S3 keys]}, {source: [objects that
+    failed]} and the dedup index updates of the day's writes, which the caller saves.
+    """
+    logging.info(f"Backfilling {day} for sources {sorted(day_plan)}...")
+    written = {}
+    failed = {}
+    index_updates = []
+
+    for source, keys in day_plan.items():
+        failed[source] = []
+        if source == "website_complaints":
+            written[source] = ingest_website_complaints(
+                None,
+                s3_client_write,
+                tables=keys,
+                engine=engine,
+                schema=schema,
+                partition_date=day,
+                deduplicate=False,
+                failed=failed[source],
+                index_updates=index_updates,
+            )
+        else:
+            _, _, ingestor = S3_SOURCES[source]
+            written[source] = ingestor(
+                s3_client_read,
+                s3_client_write,
+                keys=keys,
+                partition_date=day,
+                deduplicate=False,
+                failed=failed[source],
+                index_updates=index_updates,
+            )
+
+    return written, failed, index_updates
+
+
+def run_backfill(
+    start_date,
+    end_date,
+    s3_client_read,
+    s3_client_write,
+    engine=None,
+    schema=None,
+    max_parallel=DEFAULT_MAX_PARALLEL,
+    sources=None,
+):
+    """
+    Rebuild RAW partitions for a historical date range.
+
+    Dates run concurrently on at most max_parallel threads. Dedup is limited to rows
+    first delivered by other source objects, so each partition is rewritten in place,
+    which makes re-running a range idempotent. Once every date succeeded, the dedup
+    index and fingerprints are updated from this single thread, so the next daily run
+    does not upload the backfilled rows again.
+
+    Raises RuntimeError listing the dates and objects that failed; nothing is then
+    handed on for deletion or loading.
+
+    Returns:
+    - written: {source: [raw S3 keys]} for targeted COPY
+    - lineage: {source: [source_file / source_table values]} whose RAW rows must be deleted first
+    - batch_loaded_after: UTC timestamp taken before any write, passed to dbt
+    - dbt_curated_select: curated models to rebuild with --full-refresh (their RAW rows were deleted)
+    - dbt_select: gold models to rebuild for the affected request days
+    """
+    start = date.fromisoformat(str(start_date))
+    end = date.fromisoformat(str(end_date))
+
+    if start > end:
+        raise ValueError(f"start_date {start} is after end_date {end}")
+
+    batch_loaded_after = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    plan = plan_backfill(start, end, s3_client_read, engine=engine, schema=schema, sources=sources)
+    logging.info(f"Backfill plan covers {len(plan)} dates between {start} and {end}.")
+
+    written = {}
+    lineage = {}
+    index_updates = {}
+    failed_days = []
+    failed_objects = []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_parallel))) as pool:
+        futures = {
+            pool.submit(backfill_date, day, day_plan, s3_client_read, s3_client_write, engine, schema): day
+            for day, day_plan in sorted(plan.items())
+        }
+
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                day_written, day_failed, index_updates[day] = future.result()
+            except Exception as e:
+                logging.error(f"Backfill failed for {day}: {e}", exc_info=True)
+                failed_days.append(day)
+                continue
+
+            for source, keys in day_written.items():
+                written.setdefault(source, []).extend(keys)
+                failed_objects.extend(day_failed[source])
+
+                # Old RAW rows are deleted only for objects that ingested completely; a
+                # partly written chunked object must not lose the rows it did not rewrite
+                lineage.setdefault(source, []).extend(
+                    lineage_value(source, k) for k in plan[day][source] if k not in day_failed[source]
+                )
+
+    if failed_days or failed_objects:
+        raise RuntimeError(
+            f"Backfill failed for dates: {sorted(failed_days)}, objects: {sorted(failed_objects)}"
+        )
+
+    # Later logical dates win for keys delivered on several days
+    apply_index_updates(
+        s3_client_write, S3_BUCKET, [u for day in sorted(index_updates) for u in index_updates[day]]
+    )
+
+    return {
+        "written": written,
+        "lineage": lineage,
+        "batch_loaded_after": batch_loaded_after,
+        "dbt_curated_select": build_curated_selector(lineage),
+        "dbt_select": build_dbt_selector(lineage, include_curated=False),
+    }
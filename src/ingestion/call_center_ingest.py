@@ -1,22 +1,29 @@
-import pandas as pd
 from datetime import datetime, timezone
 import boto3
 import logging
 
 from .s3_ingestion import write_dataframe_to_s3
+from .dtype_plan import iter_csv_frames, apply_dtype_plan, part_filename
 
 # S3 source configuration
 S3_SOURCE_BUCKET = "core-telecoms-data-lake"
 S3_SOURCE_PREFIX = "call logs/"  
 
 
-def ingest_call_center_logs(s3_client_read=None, s3_client_write=None):
+def ingest_call_center_logs(s3_client_read=None, s3_client_write=None, keys=None, partition_date=None, deduplicate=True, failed=None, index_updates=None):
     """
     Ingest call center logs from S3, transform, and load into the RAW S3 zone.
 
     Parameters:
     - s3_client_read (boto3.client): Optional S3 client for reading from the source bucket.
     - s3_client_write (boto3.client): Required S3 client for writing to the RAW zone.
+    - keys (list): Optional source object keys to ingest instead of listing the whole prefix.
+    - partition_date (str): Optional logical date (YYYY-MM-DD) of the RAW partition; defaults to today.
+    - deduplicate (bool): Skip content/rows already ingested. Backfills pass False to rewrite partitions.
+    - failed (list): Optional list that source keys which could not be ingested are appended to.
+    - index_updates (list): Optional list collecting dedup index updates of deduplicate=False writes.
+
+    Returns the list of RAW S3 keys written.
     """
 
     if s3_client_write is None:
@@ -24,20 +31,24 @@ def ingest_call_center_logs(s3_client_read=None, s3_client_write=None):
 
     
     s3_read = s3_client_read or boto3.client("s3")
+    written = []
 
     try:
         logging.info("Starting Call Center Logs ingestion from S3...")
 
-        
-        logging.info(f"Listing objects in bucket '{S3_SOURCE_BUCKET}' prefix '{S3_SOURCE_PREFIX}'...")
-        response = s3_read.list_objects_v2(
-            Bucket=S3_SOURCE_BUCKET,
-            Prefix=S3_SOURCE_PREFIX
-        )
+        if keys is not None:
+            logging.info(f"Ingesting {len(keys)} requested call center log files...")
+            response = {"Contents": [{"Key": k} for k in keys]}
+        else:
+            logging.info(f"Listing objects in bucket '{S3_SOURCE_BUCKET}' prefix '{S3_SOURCE_PREFIX}'...")
+            response = s3_read.list_objects_v2(
+                Bucket=S3_SOURCE_BUCKET,
+                Prefix=S3_SOURCE_PREFIX
+            )
 
         if "Contents" not in response:
             logging.warning("No call center log files found in S3 path.")
-            return
+            return written
 
         for obj in response["Contents"]:
             key = obj["Key"]
@@ -54,36 +65,46 @@ def ingest_call_center_logs(s3_client_read=None, s3_client_write=None):
             try:
                 
                 file_obj = s3_read.get_object(Bucket=S3_SOURCE_BUCKET, Key=key)
-                df = pd.read_csv(file_obj["Body"])
 
-                if df.empty:
-                    logging.warning(f"File {filename} is empty. Skipping.")
-                    continue
+                for suffix, df in iter_csv_frames(file_obj["Body"], "call_center_logs", file_obj.get("ContentLength")):
 
-                
-                df["source_file"] = filename
-                df["ingestion_timestamp"] = datetime.now(timezone.utc)
-                
-                print(df.head())
+                    if df.empty:
+                        logging.warning(f"File {filename} is empty. Skipping.")
+                        continue
+
+                    df["source_file"] = filename
+                    df["ingestion_timestamp"] = datetime.now(timezone.utc)
+                    df = apply_dtype_plan(df, "call_center_logs")
+
+                    print(df.head())
+
+                    logging.info(f"Read {len(df)} rows from {filename}")
 
-                logging.info(f"Read {len(df)} rows from {filename}")
+                    part_name = part_filename(parquet_filename, suffix)
+                    logging.info(f"Writing {part_name} to RAW S3...")
+                    s3_path = write_dataframe_to_s3(
+                        df=df,
+                        source="call_center_logs",
+                        filename=part_name,
+                        s3_client_write=s3_client_write,
+                        deduplicate=deduplicate,
+                        partition_date=partition_date,
+                        index_updates=index_updates,
+                    )
 
-            
-                logging.info(f"Writing {parquet_filename} to RAW S3...")
-                write_dataframe_to_s3(
-                    df=df,
-                    source="call_center_logs",
-                    filename=parquet_filename,
-                    s3_client_write=s3_client_write
-                )
+                    if s3_path:
+                        written.append(s3_path)
 
                 logging.info(f"Successfully ingested {filename}")
 
             except Exception as e:
                 logging.error(f"Error processing {filename}: {e}", exc_info=True)
+                if failed is not None:
+                    failed.append(key)
                 continue  
 
         logging.info("All call center logs ingested successfully!")
+        return written
 
     except Exception as e:
         logging.error(f"Call Center Logs ingestion failed: {e}", exc_info=True)
@@ -1,38 +1,50 @@
-import pandas as pd
 from datetime import datetime, timezone
 import logging
 
 from .s3_ingestion import write_dataframe_to_s3
+from .dtype_plan import iter_csv_frames, apply_dtype_plan, part_filename
 
 S3_SOURCE_BUCKET = "core-telecoms-data-lake"
 S3_SOURCE_PREFIX = "customers/" 
 
 
-def ingest_customers(s3_client_read, s3_client_write):
+def ingest_customers(s3_client_read, s3_client_write, keys=None, partition_date=None, deduplicate=True, failed=None, index_updates=None):
     """
     Ingest customer CSVs from S3 into RAW S3.
     
     - Uses Airflow-injected S3 clients.
     - No boto3 instantiation here (Airflow manages auth).
     - Supports idempotent + incremental future upgrades.
+    - keys: optional source object keys to ingest instead of listing the whole prefix.
+    - partition_date: optional logical date (YYYY-MM-DD) of the RAW partition; defaults to today.
+    - deduplicate: skip content/rows already ingested. Backfills pass False to rewrite partitions.
+    - failed: optional list that source keys which could not be ingested are appended to.
+    - index_updates: optional list collecting dedup index updates of deduplicate=False writes.
+
+    Returns the list of RAW S3 keys written.
     """
 
     if s3_client_read is None or s3_client_write is None:
         raise ValueError("Both s3_client_read and s3_client_write must be provided.")
 
+    written = []
+
     try:
         logging.info("Starting Customers ingestion from S3...")
 
-        
-        logging.info(f"Listing customer files in bucket '{S3_SOURCE_BUCKET}', prefix '{S3_SOURCE_PREFIX}'...")
-        response = s3_client_read.list_objects_v2(
-            Bucket=S3_SOURCE_BUCKET,
-            Prefix=S3_SOURCE_PREFIX
-        )
+        if keys is not None:
+            logging.info(f"Ingesting {len(keys)} requested customer files...")
+            response = {"Contents": [{"Key": k} for k in keys]}
+        else:
+            logging.info(f"Listing customer files in bucket '{S3_SOURCE_BUCKET}', prefix '{S3_SOURCE_PREFIX}'...")
+            response = s3_client_read.list_objects_v2(
+                Bucket=S3_SOURCE_BUCKET,
+                Prefix=S3_SOURCE_PREFIX
+            )
 
         if "Contents" not in response:
             logging.warning("No customer files found in source bucket.")
-            return
+            return written
 
         
         for obj in response["Contents"]:
@@ -47,39 +59,47 @@ def ingest_customers(s3_client_read, s3_client_write):
             try:
                 
                 file_obj = s3_client_read.get_object(Bucket=S3_SOURCE_BUCKET, Key=key)
-                df = pd.read_csv(file_obj["Body"])
+                parquet_name = key.split("/")[-1].replace(".csv", ".parquet")
 
-                if df.empty:
-                    logging.warning(f"Customer file {key} is empty. Skipping.")
-                    continue
+                for suffix, df in iter_csv_frames(file_obj["Body"], "customers", file_obj.get("ContentLength")):
 
-                
-                df["source_file"] = key
-                df["ingestion_timestamp"] = datetime.now(timezone.utc)
+                    if df.empty:
+                        logging.warning(f"Customer file {key} is empty. Skipping.")
+                        continue
 
-                print(df.head())
+                    df["source_file"] = key
+                    df["ingestion_timestamp"] = datetime.now(timezone.utc)
+                    df = apply_dtype_plan(df, "customers")
 
-                logging.info(f"Read {len(df)} rows from {key}")
+                    print(df.head())
 
-                
-                parquet_name = key.split("/")[-1].replace(".csv", ".parquet")
+                    logging.info(f"Read {len(df)} rows from {key}")
 
-                
-                logging.info(f"Writing {parquet_name} to RAW S3...")
-                write_dataframe_to_s3(
-                    df=df,
-                    source="customers",
-                    filename=parquet_name,
-                    s3_client_write=s3_client_write
-                )
+                    part_name = part_filename(parquet_name, suffix)
+                    logging.info(f"Writing {part_name} to RAW S3...")
+                    s3_path = write_dataframe_to_s3(
+                        df=df,
+                        source="customers",
+                        filename=part_name,
+                        s3_client_write=s3_client_write,
+                        deduplicate=deduplicate,
+                        partition_date=partition_date,
+                        index_updates=index_updates,
+                    )
+
+                    if s3_path:
+                        written.append(s3_path)
 
                 logging.info(f"Successfully ingested {key}")
 
             except Exception as file_error:
                 logging.error(f"Error processing {key}: {file_error}", exc_info=True)
+                if failed is not None:
+                    failed.append(key)
                 continue  
 
         logging.info("All customer files ingested successfully!")
+        return written
 
     except Exception as e:
         logging.error(f"Customer ingestion failed: {e}", exc_info=True)
@@ -0,0 +1,111 @@
+import pandas as pd
+import os
+import logging
+
+ARROW_STRING = "string[pyarrow]"
+
+# Per-source dtype plans, keyed by the raw column names of each source.
+# - category: low-cardinality fields, written to Parquet as dictionary-encoded columns
+# - string:   high-cardinality text/ids, kept as Arrow-backed strings
+# - integer:  downcast to the smallest integer type that fits
+# Date/time columns stay strings: Snowflake loads Parquet timestamps into VARIANT
+# as epoch numbers, which the curated ::timestamp casts do not expect.
+DTYPE_PLANS = {
+    "call_center_logs": {
+        "category": ["COMPLAINT_catego ry", "resolutionstatus", "source_file"],
+        "string": ["call ID", "customeR iD", "call_start_time", "call_end_time", "callLogsGenerationDate"],
+        "integer": ["Unnamed: 0", "agent ID"],
+    },
+    "customers": {
+        "category": ["Gender", "source_file"],
+        "string": ["customer_id", "name", "email", "address", "DATE of biRTH", "signup_date"],
+        "integer": [],
+    },
+    "social_media": {
+        "category": ["COMPLAINT_catego ry", "resolutionstatus", "media_channel", "source_file"],
+        "string": ["complaint_id", "customeR iD", "request_date", "resolution_date", "MediaComplaintGenerationDate"],
+        "integer": ["agent ID"],
+    },
+    "website_complaints": {
+        "category": ["COMPLAINT_catego ry", "resolutionstatus", "source_table"],
+        "string": ["request_id", "customeR iD", "request_date", "resolution_date", "webFormGenerationDate"],
+        "integer": ["agent ID"],
+    },
+}
+
+# Optional per-file memory budget; files estimated above it are processed in chunks
+INGEST_MEMORY_BUDGET_MB = os.environ.get("INGEST_MEMORY_BUDGET_MB")
+INGEST_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", "100000"))
+
+# Rough in-memory size of a CSV/table after the dtype plan, relative to its size on disk
+MEMORY_EXPANSION_FACTOR = 2
+
+
+def memory_budget_bytes():
+    return int(float(INGEST_MEMORY_BUDGET_MB) * 1024 * 1024) if INGEST_MEMORY_BUDGET_MB else None
+
+
+def exceeds_memory_budget(size_bytes):
+    """True when a source of this size is estimated to exceed the configured memory budget."""
+    budget = memory_budget_bytes()
+    if budget is None or size_bytes is None:
+        return False
+    return size_bytes * MEMORY_EXPANSION_FACTOR > budget
+
+
+def read_dtypes(source):
+    """dtype mapping for pd.read_csv so planned columns are never materialised as Python str objects."""
+    plan = DTYPE_PLANS.get(source, {})
+    dtypes = {c: "category" for c in plan.get("category", [])}
+    dtypes.update({c: ARROW_STRING for c in plan.get("string", [])})
+    return dtypes
+
+
+def apply_dtype_plan(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """
+    Apply the source's dtype plan to a frame already in memory.
+
+    Also converts any remaining all-string object column to Arrow-backed strings.
+    Columns missing from the frame are ignored.
+    """
+    plan = DTYPE_PLANS.get(source, {})
+
+    for col in plan.get("category", []):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    for col in plan.get("integer", []):
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) == "string":
+            df[col] = df[col].astype(ARROW_STRING)
+
+    return df
+
+
+def iter_csv_frames(body, source, size_bytes=None):
+    """
+    Read a CSV body with the source's dtype plan.
+
+    Yields (filename_suffix, DataFrame): a single ("", df) normally, or
+    ("_part0001", chunk), ... when the file would exceed the memory budget.
+    """
+    if not exceeds_memory_budget(size_bytes):
+        yield "", pd.read_csv(body, dtype=read_dtypes(source))
+        return
+
+    logging.info(
+        f"{size_bytes} byte file exceeds the {INGEST_MEMORY_BUDGET_MB} MB memory budget. "
+        f"Reading in chunks of {INGEST_CHUNK_ROWS} rows."
+    )
+    reader = pd.read_csv(body, dtype=read_dtypes(source), chunksize=INGEST_CHUNK_ROWS)
+    for i, chunk in enumerate(reader, start=1):
+        yield f"_part{i:04d}", chunk
+
+
+def part_filename(filename, suffix):
+    """Insert a chunk suffix before the file extension."""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}{suffix}{ext}"
@@ -0,0 +1,256 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import io
+import json
+import logging
+
+from botocore.exceptions import ClientError
+
+FINGERPRINT_FOLDER = "_fingerprints/"
+
+# Columns stamped by the pipeline itself; they change on every run and must not
+# take part in content comparison.
+VOLATILE_COLUMNS = ["ingestion_timestamp", "load_timestamp", "source_file", "source_table"]
+
+# Text form of a null in content hashes; matches str() of the NaN pandas reads into object columns
+NA_SENTINEL = "nan"
+
+# Natural keys per RAW source. A row is dropped only when its key was already
+# ingested with identical content; updated records are uploaded again.
+# Agents are a full daily snapshot of the sheet, so they only get file-level dedup.
+NATURAL_KEYS = {
+    "customers": ["customer_id"],
+    "call_center_logs": ["call ID"],
+    "social_media": ["complaint_id"],
+    "website_complaints": ["request_id"],
+}
+
+# Columns naming the source object a row came from; the seen-record index keeps
+# the object that first delivered each record so backfills can tell them apart.
+SOURCE_OBJECT_COLUMNS = ["source_file", "source_table"]
+
+
+def _object_exists(s3_client, bucket, key):
+    """Return True if the S3 object exists, False on a 404."""
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def load_json_state(s3_client, bucket: str, name: str) -> dict:
+    """Load a small JSON state document stored under the fingerprint folder. Returns {} if none exists."""
+    try:
+        obj = s3_client.get_object(Bucket=bucket, Key=f"{FINGERPRINT_FOLDER}{name}")
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return {}
+        raise
+
+    return json.loads(obj["Body"].read())
+
+
+def save_json_state(s3_client, bucket: str, name: str, state: dict):
+    """Persist a small JSON state document under the fingerprint folder."""
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=f"{FINGERPRINT_FOLDER}{name}",
+        Body=json.dumps(state).encode("utf-8"),
+    )
+
+
+def _normalized_content(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop pipeline-stamped columns, sort columns by name and make every value hashable.
+
+    Values hash the same whatever dtype plan was applied: text columns (object,
+    string, category) become Python strings with nulls as NA_SENTINEL, and numeric
+    columns are widened to 64 bits.
+    """
+    content = df.drop(columns=[c for c in VOLATILE_COLUMNS if c in df.columns])
+    content = content.reindex(sorted(content.columns, key=str), axis=1)
+
+    for col in content.columns:
+        values = content[col]
+        dtype = values.dtype
+
+        if isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)) or dtype == object:
+            # Nested JSON values (lists/dicts) are not hashable by pandas; compare their text form
+            text = values.astype(object).where(values.notna(), NA_SENTINEL)
+            content[col] = text.map(str).astype(object)
+        elif isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            content[col] = values.astype(np.int64)
+        elif isinstance(dtype, np.dtype) and dtype.kind == "f":
+            content[col] = values.astype(np.float64)
+
+    return content
+
+
+def content_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Hash the normalized content of a DataFrame.
+
+    Pipeline-stamped columns are ignored, columns are sorted by name and row
+    hashes are sorted, so the same records delivered in a different order or
+    under a different file name produce the same fingerprint.
+    """
+    content = _normalized_content(df)
+    row_hashes = np.sort(pd.util.hash_pandas_object(content, index=False).to_numpy())
+
+    digest = hashlib.sha256()
+    digest.update("|".join(str(c) for c in content.columns).encode("utf-8"))
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_exists(s3_client, bucket: str, source: str, fingerprint: str) -> bool:
+    """Check whether content with this fingerprint was already written for the source."""
+    return _object_exists(s3_client, bucket, f"{FINGERPRINT_FOLDER}{source}/files/{fingerprint}")
+
+
+def record_fingerprint(s3_client, bucket: str, source: str, fingerprint: str, s3_path: str):
+    """Persist a fingerprint marker pointing at the RAW object it was written to."""
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=f"{FINGERPRINT_FOLDER}{source}/files/{fingerprint}",
+        Body=s3_path.encode("utf-8"),
+    )
+
+
+def hash_natural_keys(df: pd.DataFrame, key_columns) -> np.ndarray:
+    """Return one uint64 hash per row, computed over the natural key columns only."""
+    keys = df[key_columns].astype(str)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+def hash_row_content(df: pd.DataFrame) -> np.ndarray:
+    """Return one uint64 hash per row over every non pipeline-stamped column."""
+    return pd.util.hash_pandas_object(_normalized_content(df), index=False).to_numpy(dtype=np.uint64)
+
+
+def hash_source_object(df: pd.DataFrame) -> np.ndarray:
+    """Return one uint64 hash per row of the source object (file or table) it came from, 0 if unknown."""
+    for col in SOURCE_OBJECT_COLUMNS:
+        if col in df.columns:
+            return pd.util.hash_pandas_object(df[col].astype(str), index=False).to_numpy(dtype=np.uint64)
+    return np.zeros(len(df), dtype=np.uint64)
+
+
+def _empty_index() -> np.ndarray:
+    return np.empty((0, 3), dtype=np.uint64)
+
+
+def load_seen_keys(s3_client, bucket: str, source: str) -> np.ndarray:
+    """
+    Load the persisted index of seen records for a source.
+
+    The index is an (n, 3) uint64 array of (natural-key hash, row-content hash,
+    source-object hash), one row per key (24 bytes per key), stored as .npy.
+    Returns an empty index when none exists yet.
+    """
+    key = f"{FINGERPRINT_FOLDER}{source}/seen_keys.npy"
+    try:
+        obj = s3_client.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return _empty_index()
+        raise
+
+    return np.load(io.BytesIO(obj["Body"].read()), allow_pickle=False).reshape(-1, 3)
+
+
+def merge_seen_keys(seen: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Add new (key, content, source object) entries to the index; a key's latest content replaces the old one."""
+    merged = pd.DataFrame(np.concatenate([seen, new]), columns=["key", "content", "source_object"])
+    merged = merged.drop_duplicates(subset="key", keep="last").sort_values("key")
+    return merged.to_numpy(dtype=np.uint64)
+
+
+def save_seen_keys(s3_client, bucket: str, source: str, seen: np.ndarray):
+    """Persist the seen-record index for a source."""
+    buffer = io.BytesIO()
+    np.save(buffer, seen.astype(np.uint64), allow_pickle=False)
+
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=f"{FINGERPRINT_FOLDER}{source}/seen_keys.npy",
+        Body=buffer.getvalue(),
+    )
+
+
+def apply_index_updates(s3_client, bucket: str, updates):
+    """
+    Save seen-record entries and fingerprints collected from deduplicate=False writes
+    (see write_dataframe_to_s3's index_updates), from a single writer.
+
+    updates are applied in list order, so later entries for a key win.
+    """
+    by_source = {}
+    for update in updates:
+        by_source.setdefault(update["source"], []).append(update)
+
+    for source, source_updates in by_source.items():
+        seen = load_seen_keys(s3_client, bucket, source)
+        for update in source_updates:
+            seen = merge_seen_keys(seen, update["entries"])
+        save_seen_keys(s3_client, bucket, source, seen)
+
+        for update in source_updates:
+            record_fingerprint(s3_client, bucket, source, update["fingerprint"], update["s3_path"])
+
+        logging.info(f"Saved {len(source_updates)} backfilled writes to the '{source}' dedup index.")
+
+
+def _pair_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """Hash each row of a small uint64 frame to one uint64 so rows can be compared with np.isin."""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def drop_seen_rows(df: pd.DataFrame, source: str, seen: np.ndarray, other_objects_only=False):
+    """
+    Drop rows already ingested unchanged: same natural key and same row content
+    as the index, plus exact duplicates inside the frame itself.
+
+    Rows whose key was seen with different content (e.g. a complaint re-delivered
+    as resolved) are kept. Rows with a null natural key never take part in dedup.
+
+    other_objects_only: only drop rows the index attributes to a different source
+    object. Backfills use this to rewrite a file's own rows without bringing back
+    duplicates of records first delivered by other files.
+
+    Returns (filtered_df, new_entries) where new_entries is an (m, 3) array of
+    (key hash, content hash, source-object hash) for the kept rows. Sources without
+    natural keys are returned unchanged with an empty array.
+    """
+    key_columns = NATURAL_KEYS.get(source)
+
+    if not key_columns or not set(key_columns).issubset(df.columns):
+        return df, _empty_index()
+
+    has_key = df[key_columns].notna().all(axis=1).to_numpy()
+    key_hashes = hash_natural_keys(df, key_columns)
+    content_hashes = hash_row_content(df)
+
+    entries = pd.DataFrame({"key": key_hashes, "content": content_hashes, "source_object": hash_source_object(df)})
+    seen_entries = pd.DataFrame(seen, columns=["key", "content", "source_object"])
+
+    # Compare (key, content) pairs exactly by hashing each pair to one uint64
+    pairs = entries[["key", "content"]]
+    unchanged = np.isin(_pair_hashes(pairs), _pair_hashes(seen_entries[["key", "content"]]))
+    duplicated = pairs.duplicated().to_numpy()
+
+    if other_objects_only:
+        unchanged &= ~np.isin(_pair_hashes(entries), _pair_hashes(seen_entries))
+
+    keep = ~has_key | (~unchanged & ~duplicated)
+
+    dropped = len(df) - int(keep.sum())
+    if dropped:
+        logging.info(f"Dropping {dropped} already-ingested rows for source '{source}' by natural key {key_columns}.")
+
+    new_entries = entries.to_numpy(dtype=np.uint64)[keep & has_key]
+    return df.loc[keep].reset_index(drop=True), new_entries
@@ -0,0 +1,84 @@
+import gspread
+from google.oauth2.service_account import Credentials
+import os
+import logging
+
+GSHEET_CREDENTIALS_PATH = "/opt/airflow/credentials/gsheet_ingestor.json"
+
+GSHEET_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+    "https://www.googleapis.com/auth/drive.readonly",
+]
+
+
+class GspreadSheetsClient:
+    """
+    Thin wrapper over gspread exposing only the three calls agent ingestion needs.
+
+    - find_key: Drive search by title (only needed when the key is not cached)
+    - get_modified_time: Drive files.get with fields=modifiedTime (cheap revision check);
+      raises FileNotFoundError when the key no longer exists
+    - get_values: one batched Sheets values.get for a whole A1 range
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_service_account_file(cls, creds_path=GSHEET_CREDENTIALS_PATH):
+        if not os.path.exists(creds_path):
+            raise FileNotFoundError(f"Google Sheets credentials file not found: {creds_path}")
+
+        logging.info("Authenticating Google Sheets client...")
+        creds = Credentials.from_service_account_file(creds_path, scopes=GSHEET_SCOPES)
+        return cls(gspread.authorize(creds))
+
+    def find_key(self, title):
+        return self.client.open(title).id
+
+    def get_modified_time(self, key):
+        try:
+            return self.client.http_client.get_file_drive_metadata(key)["modifiedTime"]
+        except gspread.exceptions.APIError as e:
+            if e.code == 404:
+                raise FileNotFoundError(f"Spreadsheet not found: {key}") from e
+            raise
+
+    def get_values(self, key, value_range):
+        response = self.client.http_client.values_get(
+            key,
+            value_range,
+            params={"valueRenderOption": "UNFORMATTED_VALUE"},
+        )
+        return response.get("values", [])
+
+
+class LocalSheetsClient:
+    """
+    In-memory stand-in for GspreadSheetsClient, for local runs and tests.
+
+    sheets maps title -> {"key": ..., "modified_time": ..., "values": [[header...], [row...], ...]}.
+    Every call is counted in self.calls so callers can assert on API usage.
+    """
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.calls = []
+
+    def _by_key(self, key):
+        for sheet in self.sheets.values():
+            if sheet["key"] == key:
+                return sheet
+        raise FileNotFoundError(f"Spreadsheet not found: {key}")
+
+    def find_key(self, title):
+        self.calls.append(("find_key", title))
+        return self.sheets[title]["key"]
+
+    def get_modified_time(self, key):
+        self.calls.append(("get_modified_time", key))
+        return self._by_key(key)["modified_time"]
+
+    def get_values(self, key, value_range):
+        self.calls.append(("get_values", key, value_range))
+        return self._by_key(key)["values"]
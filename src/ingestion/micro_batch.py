@@ -0,0 +1,210 @@
+import pandas as pd
+from datetime import datetime, timezone
+from sqlalchemy import text
+import os
+import logging
+
+from . import customers_ingest, call_center_ingest, social_media_ingest
+from .customers_ingest import ingest_customers
+from .call_center_ingest import ingest_call_center_logs
+from .social_media_ingest import ingest_social_media
+from .web_complaints_ingest import ingest_website_complaints, discover_web_form_tables
+from .s3_ingestion import S3_BUCKET
+from .fingerprint import load_json_state, save_json_state
+from .raw_load import build_dbt_selector
+
+# Watermarks of the last ingested micro-batch
+MICRO_BATCH_STATE_NAME = "micro_batch/state.json"
+
+# Batches an object or table may fail in before it is no longer retried
+MICRO_BATCH_MAX_ATTEMPTS = int(os.environ.get("MICRO_BATCH_MAX_ATTEMPTS", "3"))
+
+# S3-backed sources: (bucket, prefix, ingestor)
+S3_SOURCES = {
+    "customers": (customers_ingest.S3_SOURCE_BUCKET, customers_ingest.S3_SOURCE_PREFIX, ingest_customers),
+    "call_center_logs": (call_center_ingest.S3_SOURCE_BUCKET, call_center_ingest.S3_SOURCE_PREFIX, ingest_call_center_logs),
+    "social_media": (social_media_ingest.S3_SOURCE_BUCKET, social_media_ingest.S3_SOURCE_PREFIX, ingest_social_media),
+}
+
+
+def list_new_objects(s3_client, bucket, prefix, since=None, seen_at_since=()):
+    """
+    List object keys under a prefix modified at or after `since` (ISO timestamp).
+
+    LastModified has one-second resolution, so objects in the same second as the
+    watermark are listed too, unless they are in seen_at_since (the keys already
+    ingested at that watermark).
+
+    Returns (keys, latest_modified_iso, keys_at_latest). latest is `since` when nothing is new.
+    """
+    since_dt = datetime.fromisoformat(since) if since else None
+    keys = []
+    latest = since_dt
+    by_modified = {}
+
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith("/"):
+                continue
+
+            modified = obj["LastModified"]
+            if since_dt is not None and modified < since_dt:
+                continue
+
+            by_modified.setdefault(modified, []).append(obj["Key"])
+            if modified == since_dt and obj["Key"] in seen_at_since:
+                continue
+
+            keys.append(obj["Key"])
+            if latest is None or modified > latest:
+                latest = modified
+
+    return keys, latest.isoformat() if latest else None, by_modified.get(latest, [])
+
+
+def count_web_form_rows(engine, schema):
+    """Row count per web_form_request_* table, in one round trip."""
+    tables = discover_web_form_tables(engine, schema)
+    if not tables:
+        return {}
+
+    query = " UNION ALL ".join(
+        f"SELECT '{t}' AS table_name, COUNT(*) AS row_count FROM {schema}.{t}" for t in tables
+    )
+    df = pd.read_sql(text(query), engine)
+    return {r.table_name: int(r.row_count) for r in df.itertuples()}
+
+
+def detect_changes(s3_client_read, s3_client_write, engine=None, schema=None):
+    """
+    Compare source S3 prefixes and web form tables against the last micro-batch watermarks.
+
+    Keys that failed in the previous batch are already behind the watermark, so they
+    are carried in state["s3_retry"] ({source: {key: failed attempts}}) and re-requested
+    here. A key that changes again starts over with no failed attempts.
+
+    Returns a JSON-serialisable dict:
+    - s3: {source: [new and retried object keys]}
+    - web_forms: [tables that are new or have a changed row count]
+    - state: watermarks to persist once the batch has been ingested
+    """
+    state = load_json_state(s3_client_write, S3_BUCKET, MICRO_BATCH_STATE_NAME)
+    watermarks = dict(state.get("s3_watermarks", {}))
+    watermark_keys = dict(state.get("s3_watermark_keys", {}))
+    counts = dict(state.get("web_form_counts", {}))
+    retry = {}
+
+    new_objects = {}
+    for source, (bucket, prefix, _) in S3_SOURCES.items():
+        keys, latest, latest_keys = list_new_objects(
+            s3_client_read, bucket, prefix, watermarks.get(source), watermark_keys.get(source, [])
+        )
+        if keys:
+            logging.info(f"Detected {len(keys)} new objects for source '{source}'.")
+            watermarks[source] = latest
+            watermark_keys[source] = latest_keys
+
+        retry[source] = {
+            k: n for k, n in state.get("s3_retry", {}).get(source, {}).items() if k not in keys
+        }
+        if retry[source]:
+            logging.info(f"Retrying {len(retry[source])} previously failed objects for source '{source}'.")
+
+        if keys or retry[source]:
+            new_objects[source] = keys + list(retry[source])
+
+    changed_tables = []
+    if engine is not None:
+        current = count_web_form_rows(engine, schema)
+        changed_tables = [t for t, n in current.items() if counts.get(t) != n]
+        if changed_tables:
+            logging.info(f"Detected new rows in web form tables: {changed_tables}")
+        counts = current
+
+    return {
+        "s3": new_objects,
+        "web_forms": changed_tables,
+        "state": {
+            "s3_watermarks": watermarks,
+            "s3_watermark_keys": watermark_keys,
+            "s3_retry": retry,
+            "web_form_counts": counts,
+            "web_form_retry": state.get("web_form_retry", {}),
+        },
+    }
+
+
+def has_changes(changes):
+    return bool(changes["s3"] or changes["web_forms"])
+
+
+def _next_attempts(failed, attempts, label):
+    """
+    Failed attempt counts of the objects/tables to retry next batch.
+
+    Ones that reached MICRO_BATCH_MAX_ATTEMPTS are logged as errors and dropped.
+    """
+    retry = {}
+    for name in failed:
+        count = attempts.get(name, 0) + 1
+        if count >= MICRO_BATCH_MAX_ATTEMPTS:
+            logging.error(f"Giving up on {label} {name} after {count} failed attempts.")
+        else:
+            logging.warning(f"{label.capitalize()} {name} failed (attempt {count}). It will be retried.")
+            retry[name] = count
+    return retry
+
+
+def run_micro_batch_ingestion(changes, s3_client_read, s3_client_write, session=None, engine=None, schema=None):
+    """
+    Ingest only the objects and tables reported by detect_changes, then advance the watermarks.
+
+    S3 keys the ingestors report as failed are saved for retry by the next detect_changes;
+    failed web form tables lose their row count so they are detected again. After
+    MICRO_BATCH_MAX_ATTEMPTS failed batches an object or table is logged as an error
+    and no longer retried until it changes.
+
+    Returns:
+    - written: {source: [raw S3 keys]} for targeted COPY
+    - batch_loaded_after: UTC timestamp taken before any write, passed to dbt
+    - dbt_select: models to rebuild for this batch
+    """
+    batch_loaded_after = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    written = {}
+    state = dict(changes["state"])
+    previous_retry = state.get("s3_retry", {})
+    state["s3_retry"] = {}
+
+    for source, keys in changes["s3"].items():
+        _, _, ingestor = S3_SOURCES[source]
+        failed = []
+        written[source] = ingestor(s3_client_read, s3_client_write, keys=keys, failed=failed)
+        if failed:
+            state["s3_retry"][source] = _next_attempts(
+                failed, previous_retry.get(source, {}), f"source '{source}' object"
+            )
+
+    if changes["web_forms"]:
+        failed = []
+        written["website_complaints"] = ingest_website_complaints(
+            session,
+            s3_client_write,
+            tables=changes["web_forms"],
+            engine=engine,
+            schema=schema,
+            failed=failed,
+        )
+        retry = _next_attempts(failed, state.get("web_form_retry", {}), "web form table")
+        state["web_form_retry"] = retry
+        state["web_form_counts"] = {
+            t: n for t, n in state["web_form_counts"].items() if t not in retry
+        }
+
+    save_json_state(s3_client_write, S3_BUCKET, MICRO_BATCH_STATE_NAME, state)
+
+    return {
+        "written": written,
+        "batch_loaded_after": batch_loaded_after,
+        "dbt_select": build_dbt_selector(written),
+    }
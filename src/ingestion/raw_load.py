@@ -0,0 +1,151 @@
+import logging
+
+from .s3_ingestion import RAW_FOLDER
+
+# External stage pointing at s3://<raw bucket>/raw/
+SNOWFLAKE_STAGE = "@raw.coretelecoms_stage"
+
+RAW_TABLES = {
+    "customers": "RAW.CUSTOMERS_RAW",
+    "agents": "RAW.AGENTS_RAW",
+    "call_center_logs": "RAW.CALL_CENTER_LOGS_RAW",
+    "social_media": "RAW.SOCIAL_MEDIA_RAW",
+    "website_complaints": "RAW.WEBSITE_COMPLAINTS_RAW",
+}
+
+# Column stamped by each ingestor identifying the source object a RAW row came from
+LINEAGE_COLUMNS = {
+    "customers": "source_file",
+    "call_center_logs": "source_file",
+    "social_media": "source_file",
+    "website_complaints": "source_table",
+}
+
+# Curated dbt model built from each RAW source
+CURATED_MODELS = {
+    "customers": "customers",
+    "agents": "agents",
+    "call_center_logs": "call_center_logs",
+    "social_media": "social_media",
+    "website_complaints": "website_complaint_forms",
+}
+
+# RAW expression of the gold request_day of each complaint source (matches the curated casts)
+REQUEST_DAY_EXPRESSIONS = {
+    "call_center_logs": "DATE_TRUNC('day', data:\"call_start_time\"::timestamp)",
+    "social_media": "DATE_TRUNC('day', TRY_TO_TIMESTAMP(NULLIF(data:\"request_date\"::string, '')))",
+    "website_complaints": "DATE_TRUNC('day', TRY_TO_TIMESTAMP(NULLIF(data:\"request_date\"::string, '')))",
+}
+
+# Gold models that support partition-level refresh via the batch_loaded_after var
+INCREMENTAL_GOLD_MODELS = ["fct_all_complaints", "agg_daily_complaints"]
+
+# Snowflake accepts at most 1000 names in a COPY ... FILES list
+COPY_FILES_LIMIT = 1000
+
+
+def build_targeted_copy_statements(written, force=False):
+    """
+    Build COPY INTO statements that load only the given RAW files.
+
+    written: {source: [raw S3 key, ...]} as returned by the ingestors.
+    Keys are made relative to the stage, which is rooted at RAW_FOLDER.
+    force: reload files Snowflake has already loaded (backfills delete the old rows first).
+    """
+    statements = []
+
+    for source, keys in written.items():
+        if not keys:
+            continue
+
+        table = RAW_TABLES[source]
+        files = [k[len(RAW_FOLDER):] if k.startswith(RAW_FOLDER) else k for k in keys]
+
+        for i in range(0, len(files), COPY_FILES_LIMIT):
+            file_list = ", ".join(f"'{f}'" for f in files[i:i + COPY_FILES_LIMIT])
+            statements.append(
+                f"COPY INTO {table} FROM {SNOWFLAKE_STAGE} "
+                f"FILES = ({file_list}) FILE_FORMAT = (TYPE = PARQUET)"
+                f"{' FORCE = TRUE' if force else ''};"
+            )
+
+    logging.info(f"Built {len(statements)} targeted COPY statements.")
+    return statements
+
+
+def build_targeted_delete_statements(lineage):
+    """
+    Build DELETE statements removing RAW rows that came from the given source objects,
+    so a backfill can reload them without duplicating rows.
+
+    lineage: {source: [source_file / source_table value, ...]}
+    """
+    statements = []
+
+    for source, values in lineage.items():
+        if not values:
+            continue
+
+        column = LINEAGE_COLUMNS[source]
+        value_list = ", ".join("'" + v.replace("'", "''") + "'" for v in values)
+        statements.append(
+            f"DELETE FROM {RAW_TABLES[source]} WHERE data:\"{column}\"::string IN ({value_list});"
+        )
+
+    logging.info(f"Built {len(statements)} targeted DELETE statements.")
+    return statements
+
+
+def build_request_day_query(lineage):
+    """
+    Build one SELECT returning the distinct request days (YYYY-MM-DD) of the RAW rows
+    that build_targeted_delete_statements(lineage) is about to delete, or None.
+
+    Gold partitions of those days must be rebuilt even when no reloaded row lands on them.
+    """
+    selects = []
+
+    for source, values in lineage.items():
+        if not values or source not in REQUEST_DAY_EXPRESSIONS:
+            continue
+
+        column = LINEAGE_COLUMNS[source]
+        value_list = ", ".join("'" + v.replace("'", "''") + "'" for v in values)
+        selects.append(
+            f"SELECT {REQUEST_DAY_EXPRESSIONS[source]} AS request_day FROM {RAW_TABLES[source]} "
+            f"WHERE data:\"{column}\"::string IN ({value_list})"
+        )
+
+    if not selects:
+        return None
+
+    return (
+        "SELECT DISTINCT TO_VARCHAR(request_day, 'YYYY-MM-DD') FROM ("
+        + " UNION ALL ".join(selects)
+        + ") WHERE request_day IS NOT NULL;"
+    )
+
+
+def build_curated_selector(written):
+    """dbt --select argument covering the curated model of each changed source."""
+    return " ".join(CURATED_MODELS[s] for s, keys in written.items() if keys)
+
+
+def build_dbt_selector(written, include_curated=True):
+    """
+    dbt --select argument covering only the models affected by the written files:
+    the curated model of each changed source plus the incremental gold models.
+
+    include_curated=False leaves the curated models out, for callers that rebuild them separately.
+    """
+    sources = [s for s, keys in written.items() if keys]
+    if not sources:
+        return ""
+
+    models = [CURATED_MODELS[s] for s in sources] if include_curated else []
+
+    # fct_all_complaints joins dim_customers
+    if "customers" in sources:
+        models.append("dim_customers")
+
+    return " ".join(models + INCREMENTAL_GOLD_MODELS)
@@ -3,12 +3,31 @@ from datetime import datetime, timezone
 import io
 import os
 import logging
+import numpy as np
+
+from .fingerprint import (
+    content_fingerprint,
+    fingerprint_exists,
+    record_fingerprint,
+    load_seen_keys,
+    save_seen_keys,
+    merge_seen_keys,
+    drop_seen_rows,
+)
 
 S3_BUCKET = os.environ.get("S3_BUCKET", "coretelecoms-datalake-raw")
 RAW_FOLDER = "raw/"
 
 
-def write_dataframe_to_s3(df: pd.DataFrame, source: str, filename: str, s3_client_write):
+def write_dataframe_to_s3(
+    df: pd.DataFrame,
+    source: str,
+    filename: str,
+    s3_client_write,
+    deduplicate=True,
+    partition_date=None,
+    index_updates=None,
+):
     """
     Writes a DataFrame to S3 as Parquet using Airflow's injected S3 client.
 
@@ -17,19 +36,65 @@ def write_dataframe_to_s3(df: pd.DataFrame, source: str, filename: str, s3_clien
     - Logging row count + columns
     - Logging final S3 path
     - Full error traceback
+    - Content fingerprinting: identical content re-delivered under any name is skipped
+    - Row dedup: rows already ingested unchanged (same natural key and content) are dropped before upload
+    - deduplicate=False (backfills): the file is rewritten in place, dropping only rows first delivered by another source object
+    - partition_date: logical date (YYYY-MM-DD) of the raw/<source>/<date>/ partition; defaults to today (UTC)
+    - index_updates: with deduplicate=False, a list that this write's seen-record entries and
+      fingerprint are appended to, for the caller to save once (see apply_index_updates)
+
+    Returns the written S3 key, or None when the write was skipped as a duplicate.
     """
 
     try:
         logging.info(f"Preparing to upload DataFrame for source '{source}'...")
 
-        
+        fingerprint = None
+        new_keys = np.empty((0, 3), dtype=np.uint64)
+
+        if deduplicate:
+            fingerprint = content_fingerprint(df)
+
+            if fingerprint_exists(s3_client_write, S3_BUCKET, source, fingerprint):
+                logging.info(
+                    f"Content of {filename} matches an already-written fingerprint ({fingerprint[:12]}). Skipping write."
+                )
+                return None
+
+            seen = load_seen_keys(s3_client_write, S3_BUCKET, source)
+            input_rows = len(df)
+            df, new_keys = drop_seen_rows(df, source, seen)
+
+            if df.empty:
+                logging.info(f"All rows in {filename} were already ingested for source '{source}'. Skipping write.")
+                record_fingerprint(s3_client_write, S3_BUCKET, source, fingerprint, "")
+                return None
+
+            # A partial delta must not overwrite an earlier full file with the same name
+            if len(df) < input_rows:
+                stem, ext = os.path.splitext(filename)
+                filename = f"{stem}_{fingerprint[:12]}{ext}"
+        else:
+            # Concurrent backfill dates must not rewrite the index themselves
+            fingerprint = content_fingerprint(df)
+            seen = load_seen_keys(s3_client_write, S3_BUCKET, source)
+            df, new_keys = drop_seen_rows(df, source, seen, other_objects_only=True)
+
+            if df.empty:
+                logging.info(f"All rows in {filename} belong to other source objects for '{source}'. Skipping write.")
+                if index_updates is not None:
+                    index_updates.append({
+                        "source": source, "entries": new_keys, "fingerprint": fingerprint, "s3_path": "",
+                    })
+                return None
+
         df["load_timestamp"] = datetime.now(timezone.utc)
 
         row_count = len(df)
         logging.info(f"DataFrame contains {row_count} rows and {len(df.columns)} columns.")
 
       
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        date_str = partition_date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
         s3_path = f"{RAW_FOLDER}{source}/{date_str}/{filename}"
 
         logging.info(f"Target S3 path: s3://{S3_BUCKET}/{s3_path}")
@@ -46,10 +111,21 @@ def write_dataframe_to_s3(df: pd.DataFrame, source: str, filename: str, s3_clien
             Body=buffer.getvalue()
         )
 
+        if deduplicate:
+            if len(new_keys):
+                save_seen_keys(s3_client_write, S3_BUCKET, source, merge_seen_keys(seen, new_keys))
+            record_fingerprint(s3_client_write, S3_BUCKET, source, fingerprint, s3_path)
+        elif index_updates is not None:
+            index_updates.append({
+                "source": source, "entries": new_keys, "fingerprint": fingerprint, "s3_path": s3_path,
+            })
+
         logging.info(
             f"Successfully Ingested {filename} ({row_count} rows) → s3://{S3_BUCKET}/{s3_path}"
         )
 
+        return s3_path
+
     except Exception as e:
         logging.error(
             f"Failed to write DataFrame to S3 for source '{source}' — {e}",
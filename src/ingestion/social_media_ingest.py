@@ -4,41 +4,54 @@ import logging
 import boto3
 
 from .s3_ingestion import write_dataframe_to_s3
+from .dtype_plan import apply_dtype_plan, exceeds_memory_budget
 
 
 S3_SOURCE_BUCKET = "core-telecoms-data-lake"
 S3_SOURCE_PREFIX = "social_medias/"  
 
 
-def ingest_social_media(s3_client_read=None, s3_client_write=None):
+def ingest_social_media(s3_client_read=None, s3_client_write=None, keys=None, partition_date=None, deduplicate=True, failed=None, index_updates=None):
     """
     Ingest social media JSON complaints from S3 into the RAW S3 layer.
 
     Parameters:
     - s3_client_read: Optional boto3 client for reading from S3.
     - s3_client_write: Required boto3 client for writing to RAW S3.
+    - keys: Optional source object keys to ingest instead of listing the whole prefix.
+    - partition_date: Optional logical date (YYYY-MM-DD) of the RAW partition; defaults to today.
+    - deduplicate: Skip content/rows already ingested. Backfills pass False to rewrite partitions.
+    - failed: Optional list that source keys which could not be ingested are appended to.
+    - index_updates: Optional list collecting dedup index updates of deduplicate=False writes.
+
+    Returns the list of RAW S3 keys written.
     """
 
     if s3_client_write is None:
         raise ValueError("s3_client_write must be provided for writing to RAW S3")
 
     s3_read = s3_client_read or boto3.client("s3")
+    written = []
 
     try:
         logging.info("Starting Social Media Complaints ingestion from S3...")
 
-        logging.info(
-            f"Listing social media files in bucket '{S3_SOURCE_BUCKET}', prefix '{S3_SOURCE_PREFIX}'..."
-        )
+        if keys is not None:
+            logging.info(f"Ingesting {len(keys)} requested social media files...")
+            response = {"Contents": [{"Key": k} for k in keys]}
+        else:
+            logging.info(
+                f"Listing social media files in bucket '{S3_SOURCE_BUCKET}', prefix '{S3_SOURCE_PREFIX}'..."
+            )
 
-        response = s3_read.list_objects_v2(
-            Bucket=S3_SOURCE_BUCKET,
-            Prefix=S3_SOURCE_PREFIX
-        )
+            response = s3_read.list_objects_v2(
+                Bucket=S3_SOURCE_BUCKET,
+                Prefix=S3_SOURCE_PREFIX
+            )
 
         if "Contents" not in response:
             logging.warning("No social media JSON files found.")
-            return
+            return written
 
         for obj in response["Contents"]:
             key = obj["Key"]
@@ -50,6 +63,11 @@ def ingest_social_media(s3_client_read=None, s3_client_write=None):
 
             try:
                 file_obj = s3_read.get_object(Bucket=S3_SOURCE_BUCKET, Key=key)
+
+                # JSON array documents cannot be streamed, so the budget can only be reported here
+                if exceeds_memory_budget(file_obj.get("ContentLength")):
+                    logging.warning(f"File {key} exceeds the ingest memory budget but JSON arrays cannot be chunked.")
+
                 df = pd.read_json(file_obj["Body"])
 
                 if df.empty:
@@ -60,6 +78,7 @@ def ingest_social_media(s3_client_read=None, s3_client_write=None):
 
                 df["source_file"] = key.split("/")[-1]
                 df["ingestion_timestamp"] = datetime.now(timezone.utc)
+                df = apply_dtype_plan(df, "social_media")
 
                 print(df.head())
 
@@ -67,13 +86,19 @@ def ingest_social_media(s3_client_read=None, s3_client_write=None):
 
                 logging.info(f"Writing {parquet_filename} to RAW S3...")
 
-                write_dataframe_to_s3(
+                s3_path = write_dataframe_to_s3(
                     df=df,
                     source="social_media",
                     filename=parquet_filename,
-                    s3_client_write=s3_client_write
+                    s3_client_write=s3_client_write,
+                    deduplicate=deduplicate,
+                    partition_date=partition_date,
+                    index_updates=index_updates,
                 )
 
+                if s3_path:
+                    written.append(s3_path)
+
                 logging.info(f"Successfully ingested {key}")
 
             except Exception as file_error:
@@ -81,9 +106,12 @@ def ingest_social_media(s3_client_read=None, s3_client_write=None):
                     f"Error processing social media file {key}: {file_error}",
                     exc_info=True
                 )
+                if failed is not None:
+                    failed.append(key)
                 continue  
 
         logging.info("All social media JSON files ingested successfully!")
+        return written
 
     except Exception as e:
         logging.error(f"Social Media ingestion failed: {e}", exc_info=True)
@@ -1,4 +1,5 @@
 import pandas as pd
+from contextlib import ExitStack
 from datetime import datetime, timezone
 from sqlalchemy import create_engine
 from sqlalchemy.engine import URL
@@ -6,6 +7,13 @@ from sqlalchemy import text
 import logging
 
 from .s3_ingestion import write_dataframe_to_s3
+from .dtype_plan import (
+    apply_dtype_plan,
+    exceeds_memory_budget,
+    memory_budget_bytes,
+    part_filename,
+    INGEST_CHUNK_ROWS,
+)
 
 
 def get_postgres_credentials(ssm_client):
@@ -51,26 +59,24 @@ def discover_web_form_tables(engine, schema):
 
     
 
-def ingest_website_complaints(s3_client_read, s3_client_write):
-    """
-    s3_client_read  → boto3.Session (for SSM + read services)
-    s3_client_write → boto3 S3 client (for writing to RAW bucket)
-    """
-    
-    if s3_client_write is None:
-        raise ValueError("s3_client_write must be provided")
+def get_table_size(engine, schema, table):
+    """On-disk size of a Postgres table in bytes, used to decide whether to read it in chunks."""
+    query = text("SELECT pg_total_relation_size(CAST(:relation AS regclass)) AS size_bytes")
+    df = pd.read_sql(query, engine, params={"relation": f"{schema}.{table}"})
+    return int(df["size_bytes"].iloc[0])
 
-    if s3_client_read is None:
-        raise ValueError("s3_client_read (session) must be provided")
 
-    # s3_client_read is a boto3.Session from AwsBaseHook
-    ssm_client = s3_client_read.client("ssm")
+def create_postgres_engine(session):
+    """
+    Build the SQLAlchemy engine for the source Postgres from SSM credentials.
+
+    Returns (engine, schema).
+    """
+    ssm_client = session.client("ssm")
 
     logging.info("Fetching Postgres credentials from SSM...")
     creds = get_postgres_credentials(ssm_client)
 
-    schema = creds["table_schema_name"]
-
     # Build SQLAlchemy connection
     url = URL.create(
         drivername="postgresql+psycopg2",
@@ -82,36 +88,97 @@ def ingest_website_complaints(s3_client_read, s3_client_write):
         query={"sslmode": "require", "connect_timeout": "10"}
     )
 
-    engine = create_engine(url)
+    return create_engine(url), creds["table_schema_name"]
+
+
+def ingest_website_complaints(
+    s3_client_read,
+    s3_client_write,
+    tables=None,
+    engine=None,
+    schema=None,
+    partition_date=None,
+    deduplicate=True,
+    failed=None,
+    index_updates=None,
+):
+    """
+    s3_client_read  → boto3.Session (for SSM + read services)
+    s3_client_write → boto3 S3 client (for writing to RAW bucket)
+    tables          → optional web_form_request_* tables to ingest instead of discovering all
+    engine, schema  → optional pre-built SQLAlchemy engine (e.g. a local Postgres); skips SSM
+    partition_date  → optional logical date (YYYY-MM-DD) of the RAW partition; defaults to today
+    deduplicate     → skip content/rows already ingested; backfills pass False to rewrite partitions
+    failed          → optional list that tables which could not be ingested are appended to
+    index_updates   → optional list collecting dedup index updates of deduplicate=False writes
+
+    Returns the list of RAW S3 keys written.
+    """
+    
+    if s3_client_write is None:
+        raise ValueError("s3_client_write must be provided")
 
-    logging.info("Discovering web_form_request form tables...")
-    tables = discover_web_form_tables(engine, schema)
+    if engine is None:
+        if s3_client_read is None:
+            raise ValueError("s3_client_read (session) must be provided")
+
+        # s3_client_read is a boto3.Session from AwsBaseHook
+        engine, schema = create_postgres_engine(s3_client_read)
+
+    written = []
+
+    if tables is None:
+        logging.info("Discovering web_form_request form tables...")
+        tables = discover_web_form_tables(engine, schema)
 
     if not tables:
         logging.warning("No web_form_request_* tables found.")
-        return
+        return written
 
     for table in tables:
         logging.info(f"Processing table: {table}")
 
         try:
-            df = pd.read_sql(f"SELECT * FROM {schema}.{table}", engine)
-
-            df["source_table"] = table
-            df["ingestion_timestamp"] = datetime.now(timezone.utc)
-            
-            print(df.head())
-
-            parquet_filename = f"{table}.parquet"
-
-            write_dataframe_to_s3(
-                df=df,
-                source="website_complaints",
-                filename=parquet_filename,
-                s3_client_write=s3_client_write,
-            )
+            select = f"SELECT * FROM {schema}.{table}"
+
+            with ExitStack() as stack:
+                if memory_budget_bytes() and exceeds_memory_budget(get_table_size(engine, schema, table)):
+                    logging.info(f"Table {table} exceeds the memory budget. Reading in chunks of {INGEST_CHUNK_ROWS} rows.")
+                    # Server-side cursor: psycopg2's default client-side cursor buffers the whole table
+                    conn = stack.enter_context(engine.connect().execution_options(stream_results=True))
+                    frames = (
+                        (f"_part{i:04d}", chunk)
+                        for i, chunk in enumerate(pd.read_sql(select, conn, chunksize=INGEST_CHUNK_ROWS), start=1)
+                    )
+                else:
+                    frames = [("", pd.read_sql(select, engine))]
+
+                for suffix, df in frames:
+                    df["source_table"] = table
+                    df["ingestion_timestamp"] = datetime.now(timezone.utc)
+                    df = apply_dtype_plan(df, "website_complaints")
+
+                    print(df.head())
+
+                    parquet_filename = part_filename(f"{table}.parquet", suffix)
+
+                    s3_path = write_dataframe_to_s3(
+                        df=df,
+                        source="website_complaints",
+                        filename=parquet_filename,
+                        s3_client_write=s3_client_write,
+                        deduplicate=deduplicate,
+                        partition_date=partition_date,
+                        index_updates=index_updates,
+                    )
+
+                    if s3_path:
+                        written.append(s3_path)
 
         except Exception as e:
             logging.error(f"Failed processing table {table}: {e}")
+            if failed is not None:
+                failed.append(table)
 
     logging.info("Website complaint ingestion completed.")
+    return written
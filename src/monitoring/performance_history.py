@@ -0,0 +1,268 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+import json
+import os
+import logging
+
+from ingestion.raw_load import RAW_TABLES
+from ingestion.s3_ingestion import RAW_FOLDER
+
+DBT_TARGET_DIR = "/opt/airflow/dbt/telecoms_project/target"
+
+# run_results.json of each dbt run step, copied aside before the following dbt test overwrites it
+DBT_RUN_RESULTS_FILES = ["run_results_curated.json", "run_results_gold.json"]
+
+# Snowflake table used by the DAG; PerformanceHistoryStore defaults to an unqualified
+# table so local sqlite:/// sinks work without a MONITORING schema
+PERF_HISTORY_TABLE = os.environ.get("PERF_HISTORY_TABLE", "MONITORING.PERFORMANCE_HISTORY")
+LOCAL_PERF_HISTORY_TABLE = "performance_history"
+
+# A run is a regression when a metric exceeds threshold x its average over the last N runs
+# and is also at least PERF_MIN_DELTA_SECONDS slower, so sub-second models don't flap.
+# cloud_services_credits is recorded but not flagged: compute credits are only attributed hours later.
+PERF_BASELINE_RUNS = int(os.environ.get("PERF_BASELINE_RUNS", "10"))
+PERF_REGRESSION_THRESHOLD = float(os.environ.get("PERF_REGRESSION_THRESHOLD", "1.5"))
+PERF_MIN_DELTA_SECONDS = float(os.environ.get("PERF_MIN_DELTA_SECONDS", "30"))
+REGRESSION_METRICS = {"execution_seconds": PERF_MIN_DELTA_SECONDS}
+
+COLUMNS = [
+    "run_id",
+    "recorded_at",
+    "kind",
+    "name",
+    "status",
+    "execution_seconds",
+    "rows_affected",
+    "bytes_scanned",
+    "cloud_services_credits",
+    "files_loaded",
+    "is_regression",
+]
+
+
+def parse_dbt_run_results(path):
+    """
+    Read per-model metrics from a dbt run_results.json.
+
+    Returns a list of dicts with name, status, execution_seconds, rows_affected and query_id.
+    Missing files yield an empty list so a skipped dbt step does not fail collection.
+    """
+    if not os.path.exists(path):
+        logging.warning(f"dbt run results not found: {path}")
+        return []
+
+    with open(path) as f:
+        results = json.load(f).get("results", [])
+
+    records = []
+    for result in results:
+        adapter_response = result.get("adapter_response") or {}
+        records.append({
+            "kind": "dbt_model",
+            "name": result["unique_id"].split(".")[-1],
+            "status": result.get("status"),
+            "execution_seconds": result.get("execution_time"),
+            "rows_affected": adapter_response.get("rows_affected"),
+            "query_id": adapter_response.get("query_id"),
+        })
+
+    return records
+
+
+def fetch_query_metrics(snowflake_conn, query_ids, since):
+    """
+    Bytes scanned and cloud services credits per Snowflake query id, from
+    INFORMATION_SCHEMA.QUERY_HISTORY.
+
+    Compute credits are not collected: ACCOUNT_USAGE.QUERY_ATTRIBUTION_HISTORY lags
+    by hours, so right after the run it would report zero for most queries.
+    """
+    metrics = {}
+    if not query_ids:
+        return metrics
+
+    placeholders = ", ".join(f"%(q{i})s" for i in range(len(query_ids)))
+    params = {f"q{i}": q for i, q in enumerate(query_ids)}
+
+    cursor = snowflake_conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            SELECT query_id, bytes_scanned, credits_used_cloud_services
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY(
+                END_TIME_RANGE_START => %(since)s::timestamp_ltz,
+                RESULT_LIMIT => 10000
+            ))
+            WHERE query_id IN ({placeholders})
+            """,
+            {**params, "since": since.isoformat()},
+        )
+        for query_id, bytes_scanned, cloud_credits in cursor.fetchall():
+            metrics[query_id] = {"bytes_scanned": bytes_scanned, "cloud_services_credits": float(cloud_credits or 0)}
+    finally:
+        cursor.close()
+
+    return metrics
+
+
+def _stage_relative(path):
+    """RAW file path relative to the stage root, whether or not it carries the raw/ prefix."""
+    return path[len(RAW_FOLDER):] if path.startswith(RAW_FOLDER) else path
+
+
+def fetch_copy_metrics(snowflake_conn, since, written):
+    """
+    Files and rows loaded per RAW table since the run started, from COPY_HISTORY.
+
+    written: {source: [raw S3 keys]} written by this run's ingestion. Only those files
+    are counted, so micro-batch COPYs in the same window are not attributed to the run.
+    """
+    records = []
+
+    cursor = snowflake_conn.cursor()
+    try:
+        for source, table in RAW_TABLES.items():
+            files = {_stage_relative(k) for k in written.get(source) or []}
+
+            cursor.execute(
+                """
+                SELECT file_name, row_count
+                FROM TABLE(INFORMATION_SCHEMA.COPY_HISTORY(
+                    TABLE_NAME => %(table)s,
+                    START_TIME => %(since)s::timestamp_ltz
+                ))
+                WHERE status = 'Loaded'
+                """,
+                {"table": table, "since": since.isoformat()},
+            )
+            loaded = [int(n or 0) for name, n in cursor.fetchall() if _stage_relative(name) in files]
+
+            records.append({
+                "kind": "copy",
+                "name": table,
+                "status": "success",
+                "files_loaded": len(loaded),
+                "rows_affected": sum(loaded),
+            })
+    finally:
+        cursor.close()
+
+    return records
+
+
+def collect_performance(run_id, since, snowflake_conn=None, target_dir=DBT_TARGET_DIR, written=None):
+    """
+    Gather dbt model and COPY metrics for one pipeline run.
+
+    written: {source: [raw S3 keys]} the run ingested, used to attribute COPY history.
+    Without a Snowflake connection only the dbt run_results fields are collected.
+    """
+    records = []
+    for filename in DBT_RUN_RESULTS_FILES:
+        records.extend(parse_dbt_run_results(os.path.join(target_dir, filename)))
+
+    if snowflake_conn is not None:
+        query_metrics = fetch_query_metrics(
+            snowflake_conn, [r["query_id"] for r in records if r.get("query_id")], since
+        )
+        for record in records:
+            record.update(query_metrics.get(record.get("query_id"), {}))
+
+        records.extend(fetch_copy_metrics(snowflake_conn, since, written or {}))
+
+    recorded_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for record in records:
+        row = {c: record.get(c) for c in COLUMNS}
+        row.update({"run_id": run_id, "recorded_at": recorded_at, "is_regression": False})
+        rows.append(row)
+
+    return rows
+
+
+class PerformanceHistoryStore:
+    """
+    Performance-history table behind a SQLAlchemy engine.
+
+    Production passes the Snowflake engine and PERF_HISTORY_TABLE; local runs and
+    tests use sqlite:///... with the unqualified default table and ensure_table().
+    """
+
+    def __init__(self, engine, table=LOCAL_PERF_HISTORY_TABLE):
+        self.engine = engine
+        self.table = table
+
+    def ensure_table(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    run_id VARCHAR,
+                    recorded_at TIMESTAMP,
+                    kind VARCHAR,
+                    name VARCHAR,
+                    status VARCHAR,
+                    execution_seconds FLOAT,
+                    rows_affected BIGINT,
+                    bytes_scanned BIGINT,
+                    cloud_services_credits FLOAT,
+                    files_loaded INTEGER,
+                    is_regression BOOLEAN
+                )
+            """))
+
+    def baseline(self, kind, name, metric, runs=PERF_BASELINE_RUNS):
+        """Average of a metric over the last `runs` recorded runs, or None without history."""
+        query = text(f"""
+            SELECT AVG({metric}) FROM (
+                SELECT {metric}
+                FROM {self.table}
+                WHERE kind = :kind AND name = :name AND {metric} IS NOT NULL
+                ORDER BY recorded_at DESC
+                LIMIT {int(runs)}
+            ) recent
+        """)
+        with self.engine.connect() as conn:
+            value = conn.execute(query, {"kind": kind, "name": name}).scalar()
+        return float(value) if value is not None else None
+
+    def record(self, rows, threshold=PERF_REGRESSION_THRESHOLD):
+        """
+        Flag rows against their baselines, then insert them.
+
+        A metric regresses when it exceeds threshold x baseline and is at least the
+        metric's minimum absolute delta above it.
+
+        Returns a list of regressions: (kind, name, metric, value, baseline).
+        """
+        regressions = []
+
+        for row in rows:
+            for metric, min_delta in REGRESSION_METRICS.items():
+                value = row.get(metric)
+                if value is None:
+                    continue
+
+                baseline = self.baseline(row["kind"], row["name"], metric)
+                if baseline and value > baseline * threshold and value - baseline >= min_delta:
+                    row["is_regression"] = True
+                    regressions.append((row["kind"], row["name"], metric, value, baseline))
+
+        if rows:
+            insert = text(
+                f"INSERT INTO {self.table} ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join(':' + c for c in COLUMNS)})"
+            )
+            with self.engine.begin() as conn:
+                conn.execute(insert, rows)
+
+        logging.info(f"Recorded {len(rows)} performance rows, {len(regressions)} regressions.")
+        return regressions
+
+
+def format_regressions(regressions):
+    """Short summary for the Slack failure alert (which keeps the first 200 characters)."""
+    parts = [
+        f"{name} {metric} {value:.2f} vs {baseline:.2f} (+{(value / baseline - 1) * 100:.0f}%)"
+        for _, name, metric, value, baseline in sorted(regressions, key=lambda r: r[3] / r[4], reverse=True)
+    ]
+    return "Performance regression: " + "; ".join(parts)
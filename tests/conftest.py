@@ -0,0 +1,27 @@
+import boto3
+import pytest
+from moto import mock_aws
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from ingestion.s3_ingestion import S3_BUCKET
+
+
+@pytest.fixture
+def s3():
+    """moto-backed S3 client with the RAW bucket created."""
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=S3_BUCKET)
+        yield client
+
+
+@pytest.fixture
+def web_forms():
+    """SQLite stand-in for the web form Postgres: a `web` schema and the information_schema.tables listing it."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE ':memory:' AS web"))
+        conn.execute(text("ATTACH DATABASE ':memory:' AS information_schema"))
+        conn.execute(text("CREATE TABLE information_schema.tables (table_schema TEXT, table_name TEXT)"))
+    return engine
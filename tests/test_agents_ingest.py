@@ -0,0 +1,74 @@
+import io
+
+import pandas as pd
+
+from ingestion.agents_ingest import ingest_agents, values_to_frame, AGENTS_SHEET_TITLE
+from ingestion.gsheets_client import LocalSheetsClient
+from ingestion.s3_ingestion import S3_BUCKET
+
+VALUES = [
+    ["iD", "NamE", "experience", "state"],
+    [1, "ada", "Senior", "Lagos"],
+    [2, "bola", "Junior"],
+]
+
+
+def sheets(modified_time="2026-01-01T00:00:00Z"):
+    return LocalSheetsClient({
+        AGENTS_SHEET_TITLE: {"key": "sheet-key", "modified_time": modified_time, "values": VALUES},
+    })
+
+
+def test_values_to_frame_pads_short_rows_and_types_columns():
+    df = values_to_frame(VALUES)
+
+    assert df["iD"].dtype == "Int64"
+    assert isinstance(df["state"].dtype, pd.CategoricalDtype)
+    assert df["state"].isna().tolist() == [False, True]
+
+
+def test_first_run_reads_sheet_and_writes_raw(s3):
+    client = sheets()
+
+    written = ingest_agents(s3, sheets_client=client)
+
+    assert [c[0] for c in client.calls] == ["find_key", "get_modified_time", "get_values"]
+    assert len(written) == 1
+    body = s3.get_object(Bucket=S3_BUCKET, Key=written[0])["Body"].read()
+    assert len(pd.read_parquet(io.BytesIO(body))) == 2
+
+
+def test_unchanged_sheet_costs_one_metadata_call(s3):
+    ingest_agents(s3, sheets_client=sheets())
+
+    client = sheets()
+    written = ingest_agents(s3, sheets_client=client)
+
+    assert written == []
+    assert client.calls == [("get_modified_time", "sheet-key")]
+
+
+def test_modified_sheet_is_read_without_name_lookup(s3):
+    ingest_agents(s3, sheets_client=sheets())
+
+    client = sheets(modified_time="2026-01-02T00:00:00Z")
+    ingest_agents(s3, sheets_client=client)
+
+    assert [c[0] for c in client.calls] == ["get_modified_time", "get_values"]
+
+
+def test_stale_cached_key_falls_back_to_name_lookup(s3):
+    ingest_agents(s3, sheets_client=sheets())
+
+    # The sheet was re-created under a new key
+    client = LocalSheetsClient({
+        AGENTS_SHEET_TITLE: {"key": "new-key", "modified_time": "2026-01-01T00:00:00Z", "values": VALUES},
+    })
+    ingest_agents(s3, sheets_client=client)
+
+    assert [c[0] for c in client.calls] == ["get_modified_time", "find_key", "get_modified_time", "get_values"]
+
+    # The new key is cached for the next run
+    client.calls.clear()
+    ingest_agents(s3, sheets_client=client)
+    assert client.calls == [("get_modified_time", "new-key")]
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from ingestion import social_media_ingest
+from ingestion.backfill import run_backfill
+from ingestion.social_media_ingest import ingest_social_media
+
+SOURCE_BUCKET = social_media_ingest.S3_SOURCE_BUCKET
+PREFIX = social_media_ingest.S3_SOURCE_PREFIX
+
+
+@pytest.fixture
+def source(s3):
+    s3.create_bucket(Bucket=SOURCE_BUCKET)
+    return s3
+
+
+def put_json(s3, name, rows):
+    body = rows if isinstance(rows, str) else json.dumps(rows)
+    s3.put_object(Bucket=SOURCE_BUCKET, Key=f"{PREFIX}{name}", Body=body)
+
+
+def test_daily_run_after_backfill_uploads_nothing(source):
+    put_json(source, "media_complaint_day_2026_01_01.json", [{"complaint_id": "c1", "resolutionstatus": "Open"}])
+    assert len(ingest_social_media(source, source)) == 1
+
+    # The source object is corrected, then backfilled
+    put_json(source, "media_complaint_day_2026_01_01.json", [{"complaint_id": "c1", "resolutionstatus": "Resolved"}])
+    result = run_backfill("2026-01-01", "2026-01-01", source, source, sources=["social_media"])
+    assert result["written"] == {"social_media": ["raw/social_media/2026-01-01/media_complaint_day_2026_01_01.parquet"]}
+
+    assert ingest_social_media(source, source) == []
+
+
+def test_failed_objects_fail_the_backfill(source):
+    put_json(source, "media_complaint_day_2026_01_01.json", [{"complaint_id": "c1", "resolutionstatus": "Open"}])
+    put_json(source, "media_complaint_day_2026_01_02.json", "{not json")
+
+    with pytest.raises(RuntimeError, match="media_complaint_day_2026_01_02.json"):
+        run_backfill("2026-01-01", "2026-01-02", source, source, sources=["social_media"])
+
+    # Nothing was recorded in the dedup index, so a daily run still ingests the good object
+    assert len(ingest_social_media(source, source)) == 1
@@ -0,0 +1,63 @@
+import io
+
+import pandas as pd
+
+from ingestion import dtype_plan
+from ingestion.dtype_plan import apply_dtype_plan, iter_csv_frames, part_filename, read_dtypes
+from ingestion.fingerprint import content_fingerprint, hash_row_content
+
+CALL_LOGS_CSV = (
+    "Unnamed: 0,call ID,customeR iD,COMPLAINT_catego ry,agent ID,call_start_time,call_end_time,resolutionstatus\n"
+    "0,k1,u1,Billing,3,2026-01-01 10:00:00,2026-01-01 10:05:00,Resolved\n"
+    "1,k2,u2,Network,4,2026-01-01 11:00:00,,Open\n"
+    "2,k3,u3,Billing,3,2026-01-01 12:00:00,,Open\n"
+)
+
+
+def test_read_dtypes_maps_planned_columns():
+    dtypes = read_dtypes("call_center_logs")
+
+    assert dtypes["resolutionstatus"] == "category"
+    assert dtypes["call ID"] == dtype_plan.ARROW_STRING
+    assert "agent ID" not in dtypes
+
+
+def test_apply_dtype_plan_categorises_and_downcasts():
+    df = apply_dtype_plan(pd.read_csv(io.StringIO(CALL_LOGS_CSV)), "call_center_logs")
+
+    assert isinstance(df["resolutionstatus"].dtype, pd.CategoricalDtype)
+    assert df["agent ID"].dtype == "int8"
+    assert isinstance(df["call ID"].dtype, pd.StringDtype)
+
+
+def test_hashes_do_not_depend_on_the_dtype_plan():
+    plain = pd.read_csv(io.StringIO(CALL_LOGS_CSV))
+    planned = apply_dtype_plan(
+        pd.read_csv(io.StringIO(CALL_LOGS_CSV), dtype=read_dtypes("call_center_logs")), "call_center_logs"
+    )
+
+    assert content_fingerprint(plain) == content_fingerprint(planned)
+    assert (hash_row_content(plain) == hash_row_content(planned)).all()
+
+
+def test_iter_csv_frames_reads_whole_file_within_budget(monkeypatch):
+    monkeypatch.setattr(dtype_plan, "INGEST_MEMORY_BUDGET_MB", None)
+
+    frames = list(iter_csv_frames(io.StringIO(CALL_LOGS_CSV), "call_center_logs", size_bytes=10 ** 9))
+
+    assert [(suffix, len(df)) for suffix, df in frames] == [("", 3)]
+
+
+def test_iter_csv_frames_chunks_files_over_budget(monkeypatch):
+    monkeypatch.setattr(dtype_plan, "INGEST_MEMORY_BUDGET_MB", "1")
+    monkeypatch.setattr(dtype_plan, "INGEST_CHUNK_ROWS", 2)
+
+    frames = list(iter_csv_frames(io.StringIO(CALL_LOGS_CSV), "call_center_logs", size_bytes=1024 * 1024))
+
+    assert [(suffix, len(df)) for suffix, df in frames] == [("_part0001", 2), ("_part0002", 1)]
+    assert isinstance(frames[1][1]["resolutionstatus"].dtype, pd.CategoricalDtype)
+
+
+def test_part_filename_inserts_suffix_before_extension():
+    assert part_filename("call_logs_day_2026_01_01.parquet", "_part0002") == "call_logs_day_2026_01_01_part0002.parquet"
+    assert part_filename("agents.parquet", "") == "agents.parquet"
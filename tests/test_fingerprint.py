@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from ingestion.fingerprint import content_fingerprint, drop_seen_rows, merge_seen_keys
+
+EMPTY = np.empty((0, 3), dtype=np.uint64)
+
+
+def complaints(*rows):
+    return pd.DataFrame(rows, columns=["complaint_id", "resolutionstatus", "source_file"])
+
+
+def test_drops_rows_already_ingested_unchanged():
+    first, seen = drop_seen_rows(complaints(("c1", "Open", "a.json"), ("c2", "Open", "a.json")), "social_media", EMPTY)
+    assert len(first) == 2
+
+    again, new = drop_seen_rows(complaints(("c1", "Open", "b.json"), ("c3", "Open", "b.json")), "social_media", seen)
+
+    assert again["complaint_id"].tolist() == ["c3"]
+    assert len(new) == 1
+
+
+def test_keeps_updated_record_with_same_key():
+    _, seen = drop_seen_rows(complaints(("c1", "Open", "a.json")), "social_media", EMPTY)
+
+    updated, new = drop_seen_rows(complaints(("c1", "Resolved", "b.json")), "social_media", seen)
+
+    assert updated["resolutionstatus"].tolist() == ["Resolved"]
+
+    # The index now holds the latest content, so the same update is not uploaded twice
+    seen = merge_seen_keys(seen, new)
+    assert len(seen) == 1
+    again, _ = drop_seen_rows(complaints(("c1", "Resolved", "c.json")), "social_media", seen)
+    assert again.empty
+
+
+def test_drops_exact_duplicates_within_frame():
+    df = complaints(("c1", "Open", "a.json"), ("c1", "Open", "a.json"), ("c1", "Resolved", "a.json"))
+
+    kept, new = drop_seen_rows(df, "social_media", EMPTY)
+
+    assert kept["resolutionstatus"].tolist() == ["Open", "Resolved"]
+    assert len(new) == 2
+
+
+def test_backfill_keeps_own_rows_and_drops_other_files_duplicates():
+    _, seen = drop_seen_rows(complaints(("c1", "Open", "a.json"), ("c2", "Open", "a.json")), "social_media", EMPTY)
+
+    # b.json re-delivered c1 unchanged (dropped at ingest) plus a new c3
+    _, new = drop_seen_rows(complaints(("c1", "Open", "b.json"), ("c3", "Open", "b.json")), "social_media", seen)
+    seen = merge_seen_keys(seen, new)
+
+    own, _ = drop_seen_rows(
+        complaints(("c1", "Open", "a.json"), ("c2", "Open", "a.json")), "social_media", seen, other_objects_only=True
+    )
+    assert own["complaint_id"].tolist() == ["c1", "c2"]
+
+    other, _ = drop_seen_rows(
+        complaints(("c1", "Open", "b.json"), ("c3", "Open", "b.json")), "social_media", seen, other_objects_only=True
+    )
+    assert other["complaint_id"].tolist() == ["c3"]
+
+
+def test_null_keys_are_never_deduplicated():
+    df = complaints((None, "Open", "a.json"), (None, "Open", "a.json"))
+
+    kept, new = drop_seen_rows(df, "social_media", EMPTY)
+
+    assert len(kept) == 2
+    assert len(new) == 0
+
+
+def test_sources_without_natural_keys_are_untouched():
+    df = pd.DataFrame({"iD": [1, 1], "NamE": ["a", "a"]})
+
+    kept, new = drop_seen_rows(df, "agents", EMPTY)
+
+    assert len(kept) == 2
+    assert len(new) == 0
+
+
+def test_content_fingerprint_ignores_row_order_and_source_file():
+    df = complaints(("c1", "Open", "a.json"), ("c2", "Open", "a.json"))
+    redelivered = complaints(("c2", "Open", "b.json"), ("c1", "Open", "b.json"))
+
+    assert content_fingerprint(df) == content_fingerprint(redelivered)
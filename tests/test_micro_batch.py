@@ -0,0 +1,143 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from ingestion import social_media_ingest, web_complaints_ingest
+from ingestion.micro_batch import (
+    count_web_form_rows,
+    detect_changes,
+    has_changes,
+    list_new_objects,
+    run_micro_batch_ingestion,
+    MICRO_BATCH_MAX_ATTEMPTS,
+)
+
+SOURCE_BUCKET = social_media_ingest.S3_SOURCE_BUCKET
+PREFIX = social_media_ingest.S3_SOURCE_PREFIX
+
+COMPLAINTS = [
+    {"complaint_id": "c1", "customeR iD": "u1", "agent ID": 1, "request_date": "2026-01-01"},
+    {"complaint_id": "c2", "customeR iD": "u2", "agent ID": 2, "request_date": "2026-01-01"},
+]
+
+
+@pytest.fixture
+def source(s3):
+    s3.create_bucket(Bucket=SOURCE_BUCKET)
+    return s3
+
+
+def add_web_form_table(engine, table, request_ids):
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE web.{table} (request_id TEXT, resolutionstatus TEXT)"))
+        conn.execute(text("INSERT INTO information_schema.tables VALUES ('web', :table)"), {"table": table})
+    add_web_form_rows(engine, table, request_ids)
+
+
+def add_web_form_rows(engine, table, request_ids):
+    with engine.begin() as conn:
+        for request_id in request_ids:
+            conn.execute(text(f"INSERT INTO web.{table} VALUES (:id, 'Open')"), {"id": request_id})
+
+
+def put_json(s3, name, body):
+    s3.put_object(Bucket=SOURCE_BUCKET, Key=f"{PREFIX}{name}", Body=body)
+
+
+def test_detect_changes_lists_new_objects_then_advances_watermark(source):
+    put_json(source, "media_complaint_day_2026_01_01.json", json.dumps(COMPLAINTS))
+
+    changes = detect_changes(source, source)
+    assert changes["s3"] == {"social_media": [f"{PREFIX}media_complaint_day_2026_01_01.json"]}
+
+    result = run_micro_batch_ingestion(changes, source, source)
+    assert len(result["written"]["social_media"]) == 1
+
+    assert not has_changes(detect_changes(source, source))
+
+
+def test_failed_objects_are_retried_after_watermark_moves(source):
+    put_json(source, "media_complaint_day_2026_01_01.json", json.dumps(COMPLAINTS))
+    put_json(source, "media_complaint_day_2026_01_02.json", "{not json")
+
+    run_micro_batch_ingestion(detect_changes(source, source), source, source)
+
+    changes = detect_changes(source, source)
+    assert changes["s3"] == {"social_media": [f"{PREFIX}media_complaint_day_2026_01_02.json"]}
+
+    # Once the retried object ingests, it is no longer carried forward
+    put_json(source, "media_complaint_day_2026_01_02.json", json.dumps(COMPLAINTS[:1]))
+    run_micro_batch_ingestion(detect_changes(source, source), source, source)
+
+    assert not has_changes(detect_changes(source, source))
+
+
+def test_objects_in_the_watermark_second_are_not_missed(source):
+    put_json(source, "media_complaint_day_2026_01_01.json", json.dumps(COMPLAINTS))
+    key = f"{PREFIX}media_complaint_day_2026_01_01.json"
+    modified = source.head_object(Bucket=SOURCE_BUCKET, Key=key)["LastModified"].isoformat()
+
+    keys, latest, latest_keys = list_new_objects(source, SOURCE_BUCKET, PREFIX, since=modified)
+    assert keys == [key]
+    assert (latest, latest_keys) == (modified, [key])
+
+    # Already ingested at the watermark
+    assert list_new_objects(source, SOURCE_BUCKET, PREFIX, since=modified, seen_at_since=[key])[0] == []
+
+
+def test_always_failing_object_stops_being_retried(source):
+    put_json(source, "media_complaint_day_2026_01_02.json", "{not json")
+
+    for _ in range(MICRO_BATCH_MAX_ATTEMPTS):
+        changes = detect_changes(source, source)
+        assert changes["s3"] == {"social_media": [f"{PREFIX}media_complaint_day_2026_01_02.json"]}
+        run_micro_batch_ingestion(changes, source, source)
+
+    assert not has_changes(detect_changes(source, source))
+
+
+def test_count_web_form_rows(web_forms):
+    add_web_form_table(web_forms, "web_form_request_2026_01_01", ["r1", "r2"])
+    add_web_form_table(web_forms, "web_form_request_2026_01_02", ["r3"])
+
+    assert count_web_form_rows(web_forms, "web") == {
+        "web_form_request_2026_01_01": 2,
+        "web_form_request_2026_01_02": 1,
+    }
+
+
+def test_only_web_form_tables_with_new_rows_are_detected(source, web_forms):
+    add_web_form_table(web_forms, "web_form_request_2026_01_01", ["r1"])
+    add_web_form_table(web_forms, "web_form_request_2026_01_02", ["r2"])
+
+    changes = detect_changes(source, source, engine=web_forms, schema="web")
+    assert changes["web_forms"] == ["web_form_request_2026_01_01", "web_form_request_2026_01_02"]
+
+    result = run_micro_batch_ingestion(changes, source, source, engine=web_forms, schema="web")
+    assert len(result["written"]["website_complaints"]) == 2
+    assert not has_changes(detect_changes(source, source, engine=web_forms, schema="web"))
+
+    add_web_form_rows(web_forms, "web_form_request_2026_01_02", ["r3"])
+    assert detect_changes(source, source, engine=web_forms, schema="web")["web_forms"] == ["web_form_request_2026_01_02"]
+
+
+def test_failed_web_form_table_is_retried(source, web_forms, monkeypatch):
+    add_web_form_table(web_forms, "web_form_request_2026_01_01", ["r1"])
+
+    def fail(**kwargs):
+        raise RuntimeError("S3 unavailable")
+
+    monkeypatch.setattr(web_complaints_ingest, "write_dataframe_to_s3", fail)
+    changes = detect_changes(source, source, engine=web_forms, schema="web")
+    run_micro_batch_ingestion(changes, source, source, engine=web_forms, schema="web")
+
+    # Row count unchanged, but the failed table is detected again
+    changes = detect_changes(source, source, engine=web_forms, schema="web")
+    assert changes["web_forms"] == ["web_form_request_2026_01_01"]
+
+    monkeypatch.undo()
+    result = run_micro_batch_ingestion(changes, source, source, engine=web_forms, schema="web")
+
+    assert len(result["written"]["website_complaints"]) == 1
+    assert not has_changes(detect_changes(source, source, engine=web_forms, schema="web"))
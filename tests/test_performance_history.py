@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+from monitoring.performance_history import PerformanceHistoryStore, fetch_copy_metrics
+
+
+def model_row(run_id, seconds, credits=0.1):
+    return {
+        "run_id": run_id,
+        "recorded_at": datetime(2026, 1, 1, 0, 0, int(run_id)),
+        "kind": "dbt_model",
+        "name": "fct_all_complaints",
+        "status": "success",
+        "execution_seconds": seconds,
+        "rows_affected": 100,
+        "bytes_scanned": 1000,
+        "cloud_services_credits": credits,
+        "files_loaded": None,
+        "is_regression": False,
+    }
+
+
+@pytest.fixture
+def store():
+    store = PerformanceHistoryStore(create_engine("sqlite://"))
+    store.ensure_table()
+    return store
+
+
+def test_first_run_has_no_baseline(store):
+    assert store.record([model_row("1", 100.0)]) == []
+    assert store.baseline("dbt_model", "fct_all_complaints", "execution_seconds") == 100.0
+
+
+def test_flags_slowdown_past_threshold_and_floor(store):
+    store.record([model_row("1", 100.0), model_row("2", 100.0)])
+
+    regressions = store.record([model_row("3", 200.0)])
+
+    assert regressions == [("dbt_model", "fct_all_complaints", "execution_seconds", 200.0, 100.0)]
+
+
+def test_small_absolute_slowdown_is_not_flagged(store):
+    store.record([model_row("1", 2.0)])
+
+    # 3x slower but only 4 seconds, below PERF_MIN_DELTA_SECONDS
+    assert store.record([model_row("2", 6.0)]) == []
+
+
+def test_credits_are_recorded_but_not_flagged(store):
+    store.record([model_row("1", 100.0, credits=0.1)])
+
+    assert store.record([model_row("2", 100.0, credits=5.0)]) == []
+
+
+class FakeCursor:
+    def __init__(self, history):
+        self.history = history
+        self.table = None
+
+    def execute(self, query, params):
+        self.table = params["table"]
+
+    def fetchall(self):
+        return self.history.get(self.table, [])
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, history):
+        self.history = history
+
+    def cursor(self):
+        return FakeCursor(self.history)
+
+
+def test_copy_metrics_only_count_files_written_by_the_run():
+    history = {
+        "RAW.SOCIAL_MEDIA_RAW": [
+            ("social_media/2026-01-01/daily.parquet", 10),
+            ("social_media/2026-01-01/micro_batch.parquet", 5),
+        ],
+    }
+    written = {"social_media": ["raw/social_media/2026-01-01/daily.parquet"]}
+
+    records = fetch_copy_metrics(FakeConnection(history), datetime(2026, 1, 1), written)
+
+    social = next(r for r in records if r["name"] == "RAW.SOCIAL_MEDIA_RAW")
+    assert (social["files_loaded"], social["rows_affected"]) == (1, 10)
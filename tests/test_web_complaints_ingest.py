@@ -0,0 +1,38 @@
+import io
+
+import pandas as pd
+from sqlalchemy import text
+
+from ingestion import dtype_plan, web_complaints_ingest
+from ingestion.s3_ingestion import S3_BUCKET
+from ingestion.web_complaints_ingest import ingest_website_complaints
+
+TABLE = "web_form_request_2026_01_01"
+
+
+def add_requests(engine, count):
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE web.{TABLE} (request_id TEXT, resolutionstatus TEXT)"))
+        for i in range(count):
+            conn.execute(text(f"INSERT INTO web.{TABLE} VALUES (:id, 'Open')"), {"id": f"r{i}"})
+
+
+def test_table_over_budget_is_streamed_in_chunks(s3, web_forms, monkeypatch):
+    add_requests(web_forms, 5)
+    monkeypatch.setattr(dtype_plan, "INGEST_MEMORY_BUDGET_MB", "1")
+    monkeypatch.setattr(web_complaints_ingest, "INGEST_CHUNK_ROWS", 2)
+    monkeypatch.setattr(web_complaints_ingest, "get_table_size", lambda engine, schema, table: 1024 * 1024)
+
+    written = ingest_website_complaints(None, s3, tables=[TABLE], engine=web_forms, schema="web")
+
+    assert [k.split("/")[-1] for k in written] == [f"{TABLE}_part000{i}.parquet" for i in (1, 2, 3)]
+    sizes = [len(pd.read_parquet(io.BytesIO(s3.get_object(Bucket=S3_BUCKET, Key=k)["Body"].read()))) for k in written]
+    assert sizes == [2, 2, 1]
+
+
+def test_table_within_budget_is_read_whole(s3, web_forms):
+    add_requests(web_forms, 3)
+
+    written = ingest_website_complaints(None, s3, tables=[TABLE], engine=web_forms, schema="web")
+
+    assert [k.split("/")[-1] for k in written] == [f"{TABLE}.parquet"]